@@ -1,29 +1,198 @@
 # import bs4 as bs
 import urllib.request
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
 import sys
 import getpass
+import sqlite3
+import json
+import os
+import re
+import functools
 
 from selenium import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, StaleElementReferenceException
+
+from lxml import etree, html
+
+import asyncio
+try:
+    # only needed by get_page_links_async
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
 import time
+import threading
+import queue
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from datetime import date, datetime
 
 import pandas as pd
 import numpy as np
 
+# ### Tracing
+# Opt-in timing of the scraper. When tracer.enabled is set, every WebDriver call made through a TracedDriver
+# or on an element it returned, and every function decorated with @traced is recorded with its wall time,
+# whether it timed out, and the profile being scraped. scrape_all_profiles(..., trace=True) turns it on and
+# prints the summary at the end.
+
+# In[3]:
+
+
+class Tracer():
+    """Record wall time, calls and timeout hits per stage and per profile"""
+    
+    def __init__(self):
+        self.enabled = False
+        self.events = [] # (stage, profile, start, seconds, timed out, thread id)
+        self.origin = time.perf_counter()
+        self.local = threading.local() # profile being scraped by each thread
+        self.lock = threading.Lock()
+    
+    def reset(self):
+        with self.lock:
+            self.events = []
+            self.origin = time.perf_counter()
+    
+    def set_profile(self, profile_url):
+        self.local.profile = profile_url
+    
+    def record(self, stage, start, seconds, timed_out=False):
+        event = (stage, getattr(self.local, 'profile', None), start - self.origin, seconds, timed_out,
+                 threading.get_ident())
+        with self.lock:
+            self.events.append(event)
+    
+    def events_df(self):
+        return pd.DataFrame(self.events, columns = ["Stage", "Profile", "Start", "Seconds", "Timed out", "Thread"])
+    
+    def summary(self):
+        """Calls, timeouts and total/p50/p95/max wall time per stage, slowest stages first"""
+        events_df = self.events_df()
+        summary_df = events_df.groupby("Stage").agg(
+            Calls = ("Seconds", "size"),
+            Timeouts = ("Timed out", "sum"),
+            Total = ("Seconds", "sum"),
+            p50 = ("Seconds", lambda seconds: seconds.quantile(0.5)),
+            p95 = ("Seconds", lambda seconds: seconds.quantile(0.95)),
+            Max = ("Seconds", "max"),
+        )
+        
+        return summary_df.sort_values("Total", ascending=False)
+    
+    def profile_summary(self):
+        """Total wall time of every stage for every profile"""
+        return self.events_df().pivot_table(index="Profile", columns="Stage", values="Seconds", aggfunc="sum")
+    
+    def write_chrome_trace(self, path):
+        """Write the events as Chrome trace JSON, to be opened in chrome://tracing or Perfetto"""
+        trace_events = [{
+            "name": stage, "cat": "scraper", "ph": "X", "pid": os.getpid(), "tid": thread,
+            "ts": start * 1e6, "dur": seconds * 1e6, "args": {"profile": profile, "timed out": timed_out},
+        } for stage, profile, start, seconds, timed_out, thread in self.events]
+        
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({"traceEvents": trace_events}, file)
+
+tracer = Tracer()
+
+# decorator recording the calls of a function as a stage while tracing is enabled
+# the visibility checks return False when they time out, timeout_on_false counts those as timeout hits
+def traced(stage=None, timeout_on_false=False):
+    def decorate(function):
+        name = function.__name__ if stage is None else stage
+        
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            
+            start = time.perf_counter()
+            timed_out = False
+            try:
+                result = function(*args, **kwargs)
+                timed_out = timeout_on_false and result is False
+                return result
+            except TimeoutException:
+                timed_out = True
+                raise
+            finally:
+                tracer.record(name, start, time.perf_counter() - start, timed_out)
+        
+        return wrapper
+    return decorate
+
+class TracedDriver():
+    """WebDriver wrapper recording every method call and property read as a 'driver.<name>' stage
+    
+    The elements it returns are wrapped in TracedElement, as their calls are round trips to the browser too.
+    """
+    
+    prefix = "driver."
+    
+    def __init__(self, wrapped):
+        self.wrapped = wrapped
+    
+    def __getattr__(self, name):
+        start = time.perf_counter()
+        attribute = getattr(self.wrapped, name)
+        
+        # properties such as page_source, current_url and text are round trips to the browser too
+        if not callable(attribute):
+            tracer.record(self.prefix + name, start, time.perf_counter() - start)
+            return traced_value(attribute)
+        
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                # the browser only knows the wrapped elements, e.g. in execute_script arguments
+                args = [untraced_value(arg) for arg in args]
+                kwargs = {key: untraced_value(value) for key, value in kwargs.items()}
+                return traced_value(attribute(*args, **kwargs))
+            finally:
+                tracer.record(self.prefix + name, start, time.perf_counter() - start)
+        
+        return call
+
+class TracedElement(TracedDriver):
+    """WebElement wrapper recording every method call and property read as an 'element.<name>' stage"""
+    
+    prefix = "element."
+
+# wrap the WebElements returned by a traced call
+def traced_value(value):
+    if isinstance(value, WebElement):
+        return TracedElement(value)
+    if isinstance(value, list):
+        return [traced_value(item) for item in value]
+    
+    return value
+
+# unwrap the traced elements passed to a traced call
+def untraced_value(value):
+    if isinstance(value, TracedDriver):
+        return value.wrapped
+    if isinstance(value, (list, tuple)):
+        return type(value)(untraced_value(item) for item in value)
+    
+    return value
+
+
 # ### Functions for visibility checks and clicking buttons
 # 
 # The below contains functions to check if the various LinkedIn logos and buttons are visible on the window and functions to click on such logos/button.
 
-# In[3]:
+# In[4]:
 
 
 # check if dp is displayed upon login
 # waits for a maximum of 10 seconds for the dp to be displayed
+@traced(timeout_on_false=True)
 def login_dp_visible(driver, time_limit=10):
     try:
         login_dp = WebDriverWait(driver, time_limit).until(
@@ -36,20 +205,8 @@ def login_dp_visible(driver, time_limit=10):
     except:
         return False
     
-# check if profile pic is visible on profile page
-def profile_dp_visible(driver, time_limit=10):
-    try:
-        profile_dp = WebDriverWait(driver, time_limit).until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//div[@class='pv-top-card--photo text-align-left']")
-            )
-        )
-        return profile_dp
-    
-    except TimeoutException as error:
-        return False
-
 # check if profile pic of company page is visible
+@traced(timeout_on_false=True)
 def company_dp_visible(driver, time_limit=10):
     try:
         company_dp = WebDriverWait(driver, time_limit).until(
@@ -63,6 +220,7 @@ def company_dp_visible(driver, time_limit=10):
         return False
     
 # check if messaging window is visible
+@traced(timeout_on_false=True)
 def msg_window_visible(driver, time_limit=10):
     try:
         msg_window = WebDriverWait(driver, time_limit).until(
@@ -76,6 +234,7 @@ def msg_window_visible(driver, time_limit=10):
         return False
     
 # check if next button is visible
+@traced(timeout_on_false=True)
 def next_button_visible(driver, time_limit=10):
     try:
         next_button = WebDriverWait(driver, time_limit).until(
@@ -92,6 +251,7 @@ def next_button_visible(driver, time_limit=10):
     except TimeoutException as error:
         return False
     
+@traced(timeout_on_false=True)
 def results_page_visible(driver, time_limit=2):
     try:
         results_page = WebDriverWait(driver, time_limit).until(
@@ -104,6 +264,7 @@ def results_page_visible(driver, time_limit=2):
     except TimeoutException:
         return False
     
+@traced(timeout_on_false=True)
 def results_exists(driver, time_limit=10):
     try:
         WebDriverWait(driver, time_limit).until(
@@ -132,87 +293,7 @@ def retract_msg_window(driver):
     else:
         print("Messaging window is not visible")
 
-def more_exp_exists(driver, time_limit=3):
-    try:
-        more_exp_button = WebDriverWait(driver, time_limit).until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//button[@class='pv-profile-section__see-more-inline pv-profile-section__text-truncate-toggle link link-without-hover-state'"
-                 + " and @aria-expanded='false']")
-            )
-        )
-        return more_exp_button
-    
-    except TimeoutException as error:
-        return False
-    
-def more_skills_exists(driver, time_limit=3):
-    try:
-        more_skills_button = WebDriverWait(driver, time_limit).until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//button[@aria-controls='skill-categories-expanded'"
-                 + " and @aria-expanded='false']"
-                 + "/span[normalize-space()='Show more']")
-            )
-        )
-        return more_skills_button
-    
-    except TimeoutException as error:
-        return False
-    
-def click_more_skills(driver, time_limit=1):
-    
-    xpath = "//button[@aria-controls='skill-categories-expanded'" + " and @aria-expanded='false']" + "/span[normalize-space()='Show more']"
-    
-    scroll_page(driver)
-    
-    if more_skills_exists(driver):
-        # scroll to the show more button
-        driver.execute_script(
-            "arguments[0].scrollIntoView(true);",
-            WebDriverWait(driver, time_limit).until(
-                EC.visibility_of_element_located(
-                    (By.XPATH, xpath)
-                )
-            )
-        )
-        
-        # click the show more button
-        driver.execute_script(
-            "arguments[0].click();", 
-            WebDriverWait(driver, time_limit).until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, xpath)
-                )
-            )
-        )
-        
-def click_more_exp(driver, time_limit=1):
-    
-    xpath = "//button[@class='pv-profile-section__see-more-inline pv-profile"         + "-section__text-truncate-toggle link link-without-hover-state'"         + " and @aria-expanded='false']"
-
-    scroll_page(driver)
-    
-    if more_exp_exists(driver):
-        # scroll to the show more button
-        driver.execute_script(
-            "arguments[0].scrollIntoView(true);",
-            WebDriverWait(driver, time_limit).until(
-                EC.visibility_of_element_located(
-                    (By.XPATH, xpath)
-                )
-            )
-        )
-        
-        # click the show more button
-        driver.execute_script(
-            "arguments[0].click();", 
-            WebDriverWait(driver, time_limit).until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, xpath)
-                )
-            )
-        )
-        
+@traced()
 def click_next_button(driver, time_limit=2):    
     if next_button_visible(driver):
         try:
@@ -229,62 +310,317 @@ def click_next_button(driver, time_limit=2):
             print("Next button not displayed/clickable.")
 
 
+# probe all the elements of interest on a profile page at once, with a shared time budget,
+# instead of waiting out one WebDriverWait timeout after another for every missing element
+PROFILE_TIME_BUDGET = 3 # seconds a profile page is given to show the elements below
+
+PROFILE_PROBE_XPATHS = {
+    "profile dp": "//div[@class='pv-top-card--photo text-align-left']",
+    "more exp": "//button[@class='pv-profile-section__see-more-inline pv-profile-section__text-truncate-toggle"
+                + " link link-without-hover-state' and @aria-expanded='false']",
+    "more skills": "//button[@aria-controls='skill-categories-expanded' and @aria-expanded='false']"
+                   + "/span[normalize-space()='Show more']",
+}
+
+# returns {name: whether the xpath matches} for an object of xpaths, in one round trip
+PROBE_SCRIPT = """
+var found = {};
+for (var name in arguments[0]) {
+    found[name] = document.evaluate(arguments[0][name], document, null,
+                                    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue !== null;
+}
+return found;
+"""
+
+# scrolls to and clicks the first element matching an xpath, in one round trip
+CLICK_SCRIPT = """
+var node = document.evaluate(arguments[0], document, null,
+                             XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (node === null) {
+    return false;
+}
+node.scrollIntoView(true);
+node.click();
+return true;
+"""
+
+# polls the page until the required elements are there and the optional ones have stopped appearing
+# for settle_time seconds, or until the time budget runs out
+# returns {name: whether the element exists} for every xpath probed
+@traced()
+def probe_elements(driver, xpaths=PROFILE_PROBE_XPATHS, required=("profile dp",), time_budget=None,
+                   settle_time=0.5, poll_frequency=0.1):
+    if time_budget is None:
+        time_budget = PROFILE_TIME_BUDGET
+    
+    start = time.perf_counter()
+    found = {name: False for name in xpaths}
+    last_change = start
+    
+    while True:
+        current = driver.execute_script(PROBE_SCRIPT, xpaths) or found
+        now = time.perf_counter()
+        
+        if current != found:
+            found = current
+            last_change = now
+        
+        if all(found.values()):
+            break
+        if all(found[name] for name in required) and now - last_change >= settle_time:
+            break
+        if now - start >= time_budget:
+            break
+        
+        time.sleep(poll_frequency)
+    
+    return found
+
+# click an element by xpath without waiting for it, returns False if it is not on the page
+def click_xpath(driver, xpath):
+    return driver.execute_script(CLICK_SCRIPT, xpath)
+
+
+# ### Page readiness
+# Waits on concrete page signals (old results going stale, a changed first result,
+# document.readyState plus network idle) instead of fixed sleeps. The timeout of each signal is
+# learned from how long it took to appear before, and halved after each timeout in a row, so a
+# signal that never fires costs little. The last waits are recorded.
+
+# In[5]:
+
+
+RESULT_LINK_XPATH = "//a[@data-control-name='search_srp_result']"
+RESOURCE_COUNT_SCRIPT = """
+var count = performance.getEntriesByType('resource').length;
+performance.clearResourceTimings();
+return [document.readyState, count];
+"""
+
+class PageReadiness():
+    """Wait for page signals with adaptive timeouts"""
+    
+    def __init__(self, min_timeout=1, max_timeout=15, margin=2, history=50, max_waits=1000):
+        self.min_timeout = min_timeout # lower bound of a learned timeout, in seconds
+        self.max_timeout = max_timeout # timeout used until a signal has been observed
+        self.margin = margin # learned timeout is margin * the 95th percentile of observed waits
+        self.history = history # no. of observed waits kept per signal
+        self.observed = {} # signal -> durations of the waits that succeeded
+        self.timeouts = {} # signal -> no. of waits in a row that timed out
+        self.waits = deque(maxlen=max_waits) # (signal, seconds waited, succeeded) of the last max_waits waits
+        self.lock = threading.Lock()
+    
+    def timeout(self, signal):
+        """Timeout learned from the observed load times of a signal, halved for each timeout in a row"""
+        with self.lock:
+            observed = list(self.observed.get(signal, []))
+            timeouts = self.timeouts.get(signal, 0)
+        
+        if len(observed) == 0:
+            learned = self.max_timeout
+        else:
+            learned = min(self.max_timeout, self.margin * np.percentile(observed, 95))
+        
+        return max(self.min_timeout, learned / 2**timeouts)
+    
+    def wait(self, driver, signal, condition, timeout=None):
+        """Wait until condition(driver) is truthy, return its value or False on timeout"""
+        time_limit = self.timeout(signal) if timeout is None else timeout
+        
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(driver, time_limit, poll_frequency=0.1).until(condition)
+            succeeded = True
+        except TimeoutException:
+            result = False
+            succeeded = False
+        duration = time.perf_counter() - start
+        
+        if tracer.enabled:
+            tracer.record("wait." + signal, start, duration, not succeeded)
+        
+        with self.lock:
+            self.waits.append((signal, duration, succeeded))
+            if succeeded:
+                self.observed.setdefault(signal, deque(maxlen=self.history)).append(duration)
+                self.timeouts[signal] = 0
+            else:
+                self.timeouts[signal] = self.timeouts.get(signal, 0) + 1
+        
+        return result
+    
+    def results_changed(self, driver, old_result, old_href, timeout=None):
+        """Wait for the previous first search result to go stale or be replaced"""
+        def changed(driver):
+            if old_result is not None:
+                try:
+                    old_result.is_enabled()
+                except StaleElementReferenceException:
+                    return True
+            
+            href = first_result_href(driver)
+            return href is not None and href != old_href
+        
+        return self.wait(driver, "results changed", changed, timeout)
+    
+    def document_ready(self, driver, quiet_time=0.5, timeout=None):
+        """Wait for document.readyState to be complete and no new resources for quiet_time seconds"""
+        last = {"since": time.perf_counter()}
+        
+        def idle(driver):
+            # the resource timing buffer is cleared on every poll, so it never fills up (250 entries by default)
+            # and the count is the no. of resources loaded since the last poll
+            state, count = driver.execute_script(RESOURCE_COUNT_SCRIPT)
+            now = time.perf_counter()
+            if count != 0:
+                last["since"] = now
+                return False
+            
+            return state == 'complete' and now - last["since"] >= quiet_time
+        
+        return self.wait(driver, "document ready", idle, timeout)
+    
+    def summary(self):
+        """Count, mean, max and timeouts of the recorded waits per signal"""
+        with self.lock:
+            waits = list(self.waits)
+        waits_df = pd.DataFrame(waits, columns = ["Signal", "Seconds", "Succeeded"])
+        
+        return waits_df.groupby("Signal").agg(
+            Waits = ("Seconds", "size"),
+            Mean = ("Seconds", "mean"),
+            Max = ("Seconds", "max"),
+            Timeouts = ("Succeeded", lambda succeeded: int((~succeeded).sum())),
+        )
+
+readiness = PageReadiness()
+
+# href of the first search result on the page, None if there are no results
+def first_result_href(driver):
+    results = driver.find_elements_by_xpath(RESULT_LINK_XPATH)
+    if len(results) == 0:
+        return None
+    
+    return results[0].get_attribute("href")
+
+# check if the login form shows an error message
+def login_error_shown(driver):
+    for error_id in ["error-for-username", "error-for-password"]:
+        errors = driver.find_elements_by_id(error_id)
+        if len(errors) != 0 and errors[0].text != '':
+            return True
+    
+    return False
+
+
 # ### Miscellaneous LinkedIn functions
 # Any functions that aren't for scraping, clicking or checking for visibility.
 
-# In[4]:
+# In[6]:
 
 
-# transform linkedin date format in string to datetime objects:
+# LinkedIn date ranges look like '2014 – 2018', 'Jul 2018 – Present', 'Aug 2016' or '2019'
+DATE_RANGE_RE = re.compile(
+    r"^\s*(?:(?P<start_month>[a-z]{3})[a-z]*\.?\s+)?(?P<start_year>\d{4})\s*"
+    + r"(?:[–-]\s*(?:(?P<present>present)|(?:(?P<end_month>[a-z]{3})[a-z]*\.?\s+)?(?P<end_year>\d{4}))\s*)?$",
+    re.IGNORECASE
+)
+MONTH_NUMBERS = {month: number for number, month in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1
+)}
+
+# datetime64 array from float arrays of years, months and days, NaT where the year or month is missing
+def dates_from_parts(years, months, days):
+    dates = np.full(len(years), np.datetime64('NaT'), dtype='datetime64[ns]')
+    valid = ~(np.isnan(years) | np.isnan(months))
+    
+    months_since_epoch = ((years[valid] - 1970) * 12 + months[valid] - 1).astype('int64')
+    dates[valid] = (months_since_epoch.astype('datetime64[M]').astype('datetime64[ns]')
+                    + (days[valid] - 1).astype('timedelta64[D]'))
+    
+    return dates
+
+# transform a whole column of linkedin date ranges to datetime64 start and end dates in one pass
+# returns (start dates, end dates, ongoing) where ongoing marks the ranges ending in 'Present'
+# degree=True assumes a degree starts in Aug and ends in Jun when only years are given
+# errors='raise' raises a ValueError on strings that are not date ranges, errors='coerce' gives NaT
+def parse_date_ranges(date_strs, degree=False, errors='raise'):
+    date_strs = pd.Series(date_strs, dtype=object).fillna('').astype(str).to_numpy()
+    
+    # archived date strings repeat a lot, so the regex only runs once per distinct string
+    codes, uniques = pd.factorize(date_strs)
+    start_year, start_month, end_year, end_month = np.full((4, len(uniques)), np.nan)
+    present = np.zeros(len(uniques), dtype=bool)
+    bad = np.zeros(len(uniques), dtype=bool)
+    
+    for k, date_str in enumerate(uniques):
+        match = DATE_RANGE_RE.match(date_str)
+        if match is None:
+            bad[k] = date_str.strip() != ''
+            continue
+        
+        parts = match.groupdict()
+        start_year[k] = parts['start_year']
+        if parts['end_year'] is not None:
+            end_year[k] = parts['end_year']
+        present[k] = parts['present'] is not None
+        
+        for month, months in [(parts['start_month'], start_month), (parts['end_month'], end_month)]:
+            if month is not None:
+                months[k] = MONTH_NUMBERS.get(month.lower(), np.nan)
+                bad[k] = bad[k] or np.isnan(months[k])
+    
+    if errors == 'raise' and bad.any():
+        raise ValueError("Dates not in LinkedIn format: " + ", ".join(repr(date_str) for date_str in uniques[bad][:5]))
+    
+    is_range = present | ~np.isnan(end_year)
+    single_month = ~is_range & ~np.isnan(start_month)
+    
+    # a date range is more than 1 month, a single date is within 1 year or 1 month
+    start_month = np.where(np.isnan(start_month), np.where(is_range & degree, 8, 1), start_month)
+    end_month = np.where(is_range, np.where(np.isnan(end_month), 6 if degree else 1, end_month), start_month)
+    end_year = np.where(is_range, end_year, start_year)
+    end_day = np.where(single_month, 28, 1)
+    
+    start_month[bad] = np.nan
+    end_month[bad | present] = np.nan
+    
+    start_dates = dates_from_parts(start_year, start_month, np.ones(len(uniques)))
+    end_dates = dates_from_parts(end_year, end_month, end_day)
+    ongoing = present & ~bad
+    
+    return start_dates[codes], end_dates[codes], ongoing[codes]
+
+# transform one linkedin date range in string to datetime objects, 'present' for an ongoing range
 def transform_date_range(date_str, degree=False):
-    start_date = np.nan
-    end_date = np.nan
-    
-    # no dates available
-    if date_str == '':
-        return start_date, end_date
-    
-    # date range is only within 1 month
-    elif len(date_str.split('–')) == 1:
-        start = date_str.split('–')[0].strip()
-        end = start
-        if len(start.split(" ")) == 1:
-            start_date = datetime.strptime(start, '%Y')
-            end_date = start_date
-        elif len(start.split(" ")) == 2:
-            start_date = datetime.strptime("1 " + start, '%d %b %Y')
-            end_date = datetime.strptime("28 " + start, '%b %Y')
-        
-        return start_date, end_date
-    
-    # date range is more than 1 month
-    start, end = date_str.split('–')
-    start = start.strip()
-    end = end.strip()
-    
-    if end.lower() == 'present':
+    start_dates, end_dates, ongoing = parse_date_ranges([date_str], degree=degree)
+    
+    start_date = pd.Timestamp(start_dates[0]).to_pydatetime() if not np.isnat(start_dates[0]) else np.nan
+    end_date = pd.Timestamp(end_dates[0]).to_pydatetime() if not np.isnat(end_dates[0]) else np.nan
+    if ongoing[0]:
         end_date = 'present'
-    elif len(end.split(" ")) == 1 and degree:
-        end_date = datetime.strptime("Jun " + end, '%b %Y')
-    elif len(end.split(" ")) == 1 and not degree:
-        end_date = datetime.strptime(end, '%Y')
-    elif len(end.split(" ")) == 2:
-        end_date = datetime.strptime(end, '%b %Y')
-    else:
-        print("End date is not in correct format")
-        
-    if len(start.split(" ")) == 1 and degree:
-        start_date = datetime.strptime("Aug " + start, '%b %Y')
-    elif len(start.split(" ")) == 1 and not degree:
-        start_date = datetime.strptime(start, '%Y')
-    elif len(start.split(" ")) == 2:
-        start_date = datetime.strptime(start, '%b %Y')
-    else:
-        print("Start date is not in correct format")
-        
+    
     return start_date, end_date
+
+# check if a person has graduated given the end date of his/her degree
+def has_graduated(degree_end_date):
+    if type(degree_end_date) == float and np.isnan(degree_end_date):
+        return np.nan
+    elif degree_end_date == 'present':
+        return datetime.today() > datetime.strptime('2020', '%Y')
+    
+    return datetime.today() > degree_end_date
+
+# has_graduated for whole arrays of degree end dates and ongoing flags, NA where the end date is unknown
+def graduated_column(end_dates, ongoing):
+    graduated = pd.Series(end_dates < np.datetime64(datetime.today()), dtype='boolean')
+    graduated[ongoing] = datetime.today() > datetime.strptime('2020', '%Y')
+    graduated[np.isnat(end_dates) & ~ongoing] = pd.NA
+    
+    return graduated
         
 # scroll through the whole page
+@traced()
 def scroll_page(driver):
     for i in range(5):
         driver.execute_script(
@@ -292,33 +628,44 @@ def scroll_page(driver):
             + " * " + str(i+1) + "/5);")
 
 # expand Experiences and Skills section for the current profile page
-def expand_page(driver):
+# waits at most time_budget seconds (PROFILE_TIME_BUDGET by default) for the profile and its "Show more" buttons,
+# and returns which of them were found
+@traced()
+def expand_page(driver, time_budget=None):
+    scroll_page(driver)
+    found = probe_elements(driver, time_budget=time_budget)
+    
     try:
         # expand the experience section
-        click_more_exp(driver)
+        if found["more exp"]:
+            click_xpath(driver, PROFILE_PROBE_XPATHS["more exp"])
         
         # expand the skills section
-        click_more_skills(driver)
+        if found["more skills"]:
+            click_xpath(driver, PROFILE_PROBE_XPATHS["more skills"])
     except:
         pass
+    
+    return found
 
 # get all profile links on a page
-def get_page_links(links_dict):
+@traced()
+def get_page_links(driver, links_dict):
     
     # scroll through the whole page
     scroll_page(driver)
     
     # get all profile links
-    elements = driver.find_elements_by_xpath(
-        "//a[@data-control-name='search_srp_result']"
-    )
+    elements = driver.find_elements_by_xpath(RESULT_LINK_XPATH)
     
     # add all profile links to a dictionary
-    for element in elements:
-        link = element.get_attribute("href")
-        
+    return add_page_links(links_dict, [element.get_attribute("href") for element in elements])
+
+# add profile links to a dictionary, skipping links already in it
+def add_page_links(links_dict, links):
+    for link in links:
         # check if the link is a profile link
-        if link[:28] != 'https://www.linkedin.com/in/':
+        if link is None or link[:28] != 'https://www.linkedin.com/in/':
             continue
             
         # check if the link is already in the dictionary
@@ -361,14 +708,21 @@ def get_page_links_all(driver, url, pages='All'):
         
     while(next_button_visible(driver) and page < page_limit):
         print("Links scraped: " + str( len(list(links_dict.keys())) ) + " "*20, "\r", end="")
+        
+        old_results = driver.find_elements_by_xpath(RESULT_LINK_XPATH)
+        old_result = old_results[0] if len(old_results) != 0 else None
+        old_href = old_result.get_attribute("href") if old_result is not None else None
+        
         click_next_button(driver)
         
-        # try to avoid this, find a way to check if a page is loaded
-        time.sleep(5)
+        # wait for the results of the next page to replace the current ones
+        readiness.results_changed(driver, old_result, old_href)
         
         if results_page_visible(driver) and results_exists(driver):
             scroll_page(driver)
-            time.sleep(1)
+            
+            # wait for the results loaded by scrolling
+            readiness.document_ready(driver)
             
             # get all profile links on page
             links_dict = get_page_links(driver, links_dict)
@@ -387,7 +741,9 @@ def get_page_links_all(driver, url, pages='All'):
         
     return list(links_dict.keys())
 
-def login(driver):
+# email and password are asked for if they are not given
+@traced()
+def login(driver, email=None, password=None):
     try:
         # scroll to the login field
         driver.execute_script(
@@ -406,8 +762,10 @@ def login(driver):
         print("You are already logged in")
         return 
 
-    email = input("Please enter your Linkedin username: ")
-    password = getpass.getpass("Please enter your Linkedin password: ")
+    if email is None:
+        email = input("Please enter your Linkedin username: ")
+    if password is None:
+        password = getpass.getpass("Please enter your Linkedin password: ")
 
     if type(email) == str and type(password) == str:
         # enter username
@@ -419,10 +777,14 @@ def login(driver):
         pass_box.send_keys(password)
 
         # click submit button
+        login_page_url = driver.current_url
         submit_button = driver.find_element_by_xpath("//button[@aria-label='Sign in']")
         submit_button.click()
 
-        time.sleep(1)
+        # wait for the browser to leave the login page or for an error message
+        readiness.wait(driver, "login",
+                       lambda driver: driver.current_url != login_page_url or login_error_shown(driver))
+        readiness.document_ready(driver)
                 
         try:
             username_error_msg = driver.find_element_by_id("error-for-username").text
@@ -470,19 +832,342 @@ def get_first_job(df, degree_end_date):
     return pd.DataFrame(columns = df.columns)
 
 
+# ### Search result harvesting over HTTP
+# Instead of clicking through the search pages in the browser, the result pages are fetched concurrently
+# with aiohttp, using the cookies of the logged in driver, and the profile links of the search results
+# are taken from the raw html.
+
+# In[7]:
+
+
+PROFILE_LINK_RE = re.compile(r"^(?:https?://(?:www\.)?linkedin\.com)?/in/([A-Za-z0-9\-_%]+)")
+
+# the search results are either rendered as result links, or embedded by the web app as json in <code> elements
+SEARCH_RESULT_HREF_XPATH = etree.XPath(RESULT_LINK_XPATH + "/@href")
+SEARCH_JSON_XPATH = etree.XPath("//code/text()")
+SEARCH_RESULT_TYPE = "com.linkedin.voyager.dash.search.EntityResultViewModel"
+
+# responses worth retrying: rate limiting and server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# the url of a given page of search results
+def search_page_url(url, page):
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query) if key != 'page']
+    query.append(('page', str(page)))
+    
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+# navigationUrl of every search result in the json embedded in a search page, in document order
+def search_result_urls(data):
+    urls = []
+    stack = [data]
+    while len(stack) != 0:
+        item = stack.pop()
+        if isinstance(item, dict):
+            if item.get('$type') == SEARCH_RESULT_TYPE and isinstance(item.get('navigationUrl'), str):
+                urls.append(item['navigationUrl'])
+            stack.extend(reversed(list(item.values())))
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+    
+    return urls
+
+# profile links of the search results in the raw html of a search page
+# other /in/ links on the page, like the profile of the logged in user in the nav bar, are left out
+def extract_page_links(page_source):
+    if page_source.strip() == '':
+        return []
+    
+    tree = html.document_fromstring(page_source)
+    hrefs = SEARCH_RESULT_HREF_XPATH(tree)
+    for code in SEARCH_JSON_XPATH(tree):
+        try:
+            hrefs.extend(search_result_urls(json.loads(code)))
+        except ValueError:
+            continue
+    
+    links = []
+    for href in hrefs:
+        match = PROFILE_LINK_RE.match(href)
+        if match is not None:
+            links.append('https://www.linkedin.com/in/' + match.group(1) + '/')
+    
+    return links
+
+# seconds to wait before retrying a response, from its Retry-After header if it has one
+def retry_delay(response, delay):
+    try:
+        return max(delay, float(response.headers.get('Retry-After', 0)))
+    except ValueError:
+        return delay
+
+# a page that is rate limited, fails on the server or loses its connection is fetched again after
+# backoff, 2 * backoff, 4 * backoff... seconds, and its error is raised once it has been retried `retries` times
+async def fetch_page(session, semaphore, page_url, retries=3, backoff=1):
+    for attempt in range(retries + 1):
+        delay = backoff * 2 ** attempt
+        
+        async with semaphore:
+            try:
+                async with session.get(page_url) as response:
+                    if response.status == 200:
+                        return await response.text()
+                    
+                    if response.status not in RETRY_STATUSES or attempt == retries:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history, status=response.status,
+                            message=response.reason or '', headers=response.headers
+                        )
+                    delay = retry_delay(response, delay)
+            
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError):
+                if attempt == retries:
+                    raise
+        
+        # the other pages are fetched in the meantime
+        await asyncio.sleep(delay)
+
+# fetches pages `concurrency` at a time and stops at the first page without search results
+# the links are added to links_dict as they come in, so when a page cannot be fetched its error is raised
+# and links_dict keeps the links of the pages before it
+async def harvest_page_links(url, cookies, headers=None, pages='All', concurrency=5, links_dict=None,
+                             retries=3, backoff=1):
+    if aiohttp is None:
+        raise ImportError("get_page_links_async requires aiohttp, install it with pip install aiohttp")
+    
+    if links_dict is None:
+        links_dict = {}
+    page_limit = float('inf') if type(pages) == str and pages.lower() == 'all' else pages
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async with aiohttp.ClientSession(cookies=cookies, headers=headers) as session:
+        page = 1
+        while page <= page_limit:
+            page_range = range(page, int(min(page + concurrency, page_limit + 1)))
+            page_sources = await asyncio.gather(
+                *[fetch_page(session, semaphore, search_page_url(url, i), retries, backoff) for i in page_range],
+                return_exceptions=True
+            )
+            page += len(page_range)
+            
+            # results are added in page order
+            for page_number, page_source in zip(page_range, page_sources):
+                if isinstance(page_source, Exception):
+                    print("Page " + str(page_number) + " could not be fetched, links scraped:", len(links_dict))
+                    raise page_source
+                
+                links = extract_page_links(page_source)
+                if len(links) == 0:
+                    return links_dict
+                add_page_links(links_dict, links)
+            
+            print("Links scraped: " + str(len(links_dict)) + " "*20, "\r", end="")
+    
+    return links_dict
+
+# same as get_page_links_all, without rendering the pages in the browser
+# the driver has to be logged in, its cookies and user agent are used for the requests
+# in a notebook, where an event loop is already running, await harvest_page_links instead
+def get_page_links_async(driver, url, pages='All', concurrency=5, links_dict=None, retries=3):
+    if not ((type(pages) == str and pages.lower() == 'all') or (type(pages) == int and pages > 0)):
+        print("Enter a positive number for 'pages'")
+        return []
+    
+    cookies = {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
+    headers = {"User-Agent": driver.execute_script("return navigator.userAgent;")}
+    
+    links_dict = asyncio.run(harvest_page_links(url, cookies, headers, pages, concurrency, links_dict, retries))
+    print("Links scraped:", len(links_dict), " "*20)
+    
+    return list(links_dict.keys())
+
+
+# ### Company industry cache
+# The same employers show up across many profiles, so the industry scraped from a company's About page
+# is kept in an SQLite file, with an in-process LRU in front of it. Entries expire after `ttl` seconds.
+# A company without an industry is only remembered for `negative_ttl` seconds, since scrape_industry also
+# gives np.nan when the About page did not load in time.
+
+# In[8]:
+
+
+# maps the different forms of a company url (trailing slash, about/ page, query string) to one key
+def normalize_company_url(company_url):
+    parts = urlsplit(company_url.strip())
+    path = parts.path.lower().rstrip('/')
+    if path.endswith('/about'):
+        path = path[:-len('/about')]
+    
+    return 'https://' + parts.netloc.lower() + path + '/'
+
+class IndustryCache():
+    """Disk-backed cache of company url -> industry with an in-memory LRU in front"""
+    
+    def __init__(self, path='industry_cache.sqlite', ttl=30*24*60*60, negative_ttl=60*60, max_size=1024):
+        self.ttl = ttl # seconds before a cached industry is scraped again
+        self.negative_ttl = negative_ttl # seconds before a company cached without an industry is scraped again
+        self.max_size = max_size # number of entries kept in memory
+        self.memory = OrderedDict() # normalized url -> (industry, time scraped)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS industries (url TEXT PRIMARY KEY, industry TEXT, scraped_at REAL)"
+        )
+        self.connection.commit()
+    
+    def remember(self, key, industry, scraped_at):
+        """Put an entry in the LRU, evicting the least recently used one when full"""
+        self.memory[key] = (industry, scraped_at)
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.max_size:
+            self.memory.popitem(last=False)
+    
+    def expired(self, industry, scraped_at, now):
+        """Check if an entry is older than the ttl of its kind"""
+        ttl = self.ttl if industry is not None else self.negative_ttl
+        return now - scraped_at >= ttl
+    
+    def get(self, company_url):
+        """Return (True, industry) if the url is cached and not expired, else (False, None)"""
+        key = normalize_company_url(company_url)
+        now = time.time()
+        
+        with self.lock:
+            if key in self.memory:
+                industry, scraped_at = self.memory[key]
+                if not self.expired(industry, scraped_at, now):
+                    self.memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return True, industry
+                del self.memory[key]
+            
+            row = self.connection.execute(
+                "SELECT industry, scraped_at FROM industries WHERE url = ?", (key,)
+            ).fetchone()
+            if row is not None and not self.expired(row[0], row[1], now):
+                self.remember(key, row[0], row[1])
+                self.disk_hits += 1
+                return True, row[0]
+            
+            self.misses += 1
+            return False, None
+    
+    def set(self, company_url, industry):
+        """Store the industry of a company, np.nan is stored as NULL"""
+        key = normalize_company_url(company_url)
+        if type(industry) != str:
+            industry = None
+        scraped_at = time.time()
+        
+        with self.lock:
+            self.remember(key, industry, scraped_at)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO industries (url, industry, scraped_at) VALUES (?, ?, ?)",
+                (key, industry, scraped_at)
+            )
+            self.connection.commit()
+    
+    def stats(self):
+        """Hit and miss counters"""
+        # read together, while the pool workers may be updating them
+        with self.lock:
+            memory_hits, disk_hits, misses = self.memory_hits, self.disk_hits, self.misses
+        
+        lookups = memory_hits + disk_hits + misses
+        hit_rate = (memory_hits + disk_hits) / lookups if lookups > 0 else np.nan
+        
+        return {"memory hits": memory_hits, "disk hits": disk_hits, "misses": misses, "hit rate": hit_rate}
+    
+    def close(self):
+        self.connection.close()
+
+
+# ### Profile records
+# The scraping functions collect the rows of a profile as plain records and build each dataframe once,
+# with fixed dtypes, instead of enlarging it cell by cell with df.loc.
+
+# In[9]:
+
+
+EDU_COLUMNS = ['School', 'Degree type', 'Major', 'Degree start year', 'Degree end year',
+               'Graduated', 'Activities and societies', 'Edu description']
+EXP_COLUMNS = ["Company", "Company url", "Industry", "Job position",
+               "Career start date", "Career end date", "Career ongoing", "Career description"]
+
+@dataclass
+class EduRecord:
+    __slots__ = ['school', 'degree_type', 'major', 'dates', 'activities', 'description']
+    school: object
+    degree_type: object
+    major: object
+    dates: str # raw LinkedIn date range, e.g. '2014 – 2018'
+    activities: object
+    description: object
+
+@dataclass
+class ExpRecord:
+    __slots__ = ['company', 'company_url', 'industry', 'position', 'dates', 'description']
+    company: object
+    company_url: object
+    industry: object
+    position: object
+    dates: str # raw LinkedIn date range, e.g. 'Jul 2018 – Present'
+    description: object
+
+@traced()
+def edu_frame(records):
+    start_dates, end_dates, ongoing = parse_date_ranges([record.dates for record in records],
+                                                        degree=True, errors='coerce')
+    
+    return pd.DataFrame({
+        'School': pd.Series([record.school for record in records], dtype=object),
+        'Degree type': pd.Series([record.degree_type for record in records], dtype=object),
+        'Major': pd.Series([record.major for record in records], dtype=object),
+        'Degree start year': start_dates,
+        'Degree end year': end_dates,
+        'Graduated': graduated_column(end_dates, ongoing),
+        'Activities and societies': pd.Series([record.activities for record in records], dtype=object),
+        'Edu description': pd.Series([record.description for record in records], dtype=object),
+    }, columns = EDU_COLUMNS)
+
+@traced()
+def exp_frame(records):
+    start_dates, end_dates, ongoing = parse_date_ranges([record.dates for record in records], errors='coerce')
+    
+    # current jobs have no end date, NA where the dates are unknown
+    career_ongoing = pd.Series(ongoing, dtype='boolean')
+    career_ongoing[np.isnat(start_dates)] = pd.NA
+    
+    return pd.DataFrame({
+        'Company': pd.Series([record.company for record in records], dtype=object),
+        'Company url': pd.Series([record.company_url for record in records], dtype=object),
+        'Industry': pd.Series([record.industry for record in records], dtype=object),
+        'Job position': pd.Series([record.position for record in records], dtype=object),
+        'Career start date': start_dates,
+        'Career end date': end_dates,
+        'Career ongoing': career_ongoing,
+        'Career description': pd.Series([record.description for record in records], dtype=object),
+    }, columns = EXP_COLUMNS)
+
+
 # ### Scraping functions
 
-# In[5]:
+# In[10]:
 
 
-def scrape_name_indiv(driver, profile_url, reload=True):
+@traced()
+def scrape_name_indiv(driver, profile_url, reload=True, time_budget=None):
     df = pd.DataFrame(columns = ["Name"])
     
     if reload:
         # visit the profile url
         driver.get(profile_url)
-        profile_dp_visible()
-        expand_page()
+        expand_page(driver, time_budget)
     
     try:
         df.loc[0, 'Name'] = driver.find_element_by_xpath(
@@ -495,29 +1180,29 @@ def scrape_name_indiv(driver, profile_url, reload=True):
 
 # scrapes all the educational info of a profile specified by a profile url
 # returns the info in a pandas dataframe
-def scrape_edu_indiv(driver, profile_url, reload=True):
+@traced()
+def scrape_edu_indiv(driver, profile_url, reload=True, time_budget=None):
     # check if the link is a profile link
     if profile_url[:28] != 'https://www.linkedin.com/in/':
         print("The url is not from a Linkedin profile.")
         return pd.DataFrame()
     
-    df = pd.DataFrame(columns = ['School', 'Degree type', 'Major', 'Degree start year', 'Degree end year',
-                                 'Graduated', 'Activities and societies', 'Edu description'])
+    records = []
     education_x_path = "//section[@id='education-section']//ul/li"
-    time_info = ''
     
     if reload:
         # visit the profile url
         driver.get(profile_url)
-        profile_dp_visible()
-        expand_page()
+        expand_page(driver, time_budget)
     
     # get education web elements
     schools = driver.find_elements_by_xpath(education_x_path + "//div[@class='pv-entity__degree-info']//h3")
     
     # store information of school
     for i in range(len(schools)):
-        df.loc[i, 'School'] = driver.find_element_by_xpath(
+        record = EduRecord(np.nan, np.nan, np.nan, '', np.nan, np.nan)
+        
+        record.school = driver.find_element_by_xpath(
             education_x_path 
             + "[" + str(i+1) + "]" 
             + "//div[@class='pv-entity__degree-info']"
@@ -525,7 +1210,7 @@ def scrape_edu_indiv(driver, profile_url, reload=True):
         ).text
         
         try:
-            df.loc[i, 'Degree type'] = driver.find_element_by_xpath(
+            record.degree_type = driver.find_element_by_xpath(
                 education_x_path 
                 + "[" + str(i+1) + "]" 
                 + "//div[@class='pv-entity__degree-info']"
@@ -536,7 +1221,7 @@ def scrape_edu_indiv(driver, profile_url, reload=True):
             pass
 
         try:
-            df.loc[i, 'Major'] = driver.find_element_by_xpath(
+            record.major = driver.find_element_by_xpath(
                 education_x_path 
                 + "[" + str(i+1) + "]" 
                 + "//div[@class='pv-entity__degree-info']"
@@ -548,19 +1233,17 @@ def scrape_edu_indiv(driver, profile_url, reload=True):
             pass
 
         try:
-            time_info = driver.find_element_by_xpath(
+            record.dates = driver.find_element_by_xpath(
                 education_x_path 
                 + "[" + str(i+1) + "]"
                 + "//p[@class='pv-entity__dates t-14 t-black--light t-normal']"
                 + "/span[2]"
             ).text
         except:
-            time_info = ''
-
-        df.loc[i, 'Degree start year'], df.loc[i, 'Degree end year'] = transform_date_range(time_info, degree=True)
+            record.dates = ''
         
         try:
-            df.loc[i, 'Activities and societies'] = driver.find_element_by_xpath(
+            record.activities = driver.find_element_by_xpath(
                 education_x_path 
                 + "[" + str(i+1) + "]"
                 + "//p[@class='pv-entity__secondary-title t-14 t-black--light t-normal']"
@@ -570,7 +1253,7 @@ def scrape_edu_indiv(driver, profile_url, reload=True):
             pass
         
         try:
-            df.loc[i, 'Edu description'] = driver.find_element_by_xpath(
+            record.description = driver.find_element_by_xpath(
                 education_x_path 
                 + "[" + str(i+1) + "]" 
                 + "//div[@class='pv-entity__extra-details t-14 t-black--light ember-view']"
@@ -578,31 +1261,15 @@ def scrape_edu_indiv(driver, profile_url, reload=True):
         except:
             pass
         
-        # check if this person has graduated from his/her educational institutes
-        if type(df.loc[i, 'Degree end year']) == float and np.isnan(df.loc[i, 'Degree end year']):
-            df.loc[i, 'Graduated'] = np.nan
-        elif df.loc[i, 'Degree end year'] == 'present':
-            if datetime.today() > datetime.strptime('2020', '%Y'):
-                df.loc[i, 'Graduated'] = True
-            else:
-                df.loc[i, 'Graduated'] = False
-        elif datetime.today() > df.loc[i, 'Degree end year']:
-            df.loc[i, 'Graduated'] = True
-        else:
-            df.loc[i, 'Graduated'] = False
-            
-        if df.empty:
-            print(
-                driver.find_element_by_xpath("//ul[@class='pv-top-card--list inline-flex align-items-center']//li").text
-                + " did not do Bachelor's in NUS"
-            )
-            return pd.DataFrame(columns = df.columns)
+        records.append(record)
     
-    return df
+    # the dates are parsed and the graduation checked when the dataframe is built
+    return edu_frame(records)
 
 # scrapes all the experience info of a profile specified by a profile url
 # returns the info in a pandas dataframe
-def scrape_exp_indiv(driver, profile_url, reload=True, industries=True):
+@traced()
+def scrape_exp_indiv(driver, profile_url, reload=True, industries=True, industry_cache=None, time_budget=None):
     '''
     parameters: 
         df, a one row dataframe containing details of a person
@@ -617,31 +1284,26 @@ def scrape_exp_indiv(driver, profile_url, reload=True, industries=True):
         return pd.DataFrame()
     
     experience_x_path = "//section[@id='experience-section']/ul/li"
-    exp_df = pd.DataFrame(columns = ["Company", "Company url", "Industry", "Job position", 
-                                     "Career start date", "Career end date", "Career description"])
-    job_duration = []
+    records = []
     
     if reload:
         # visit the profile url
         driver.get(profile_url)
-        profile_dp_visible()
-        expand_page()
+        expand_page(driver, time_budget)
     
     experiences = driver.find_elements_by_xpath(experience_x_path)
     
     for i in range(len(experiences)):
         try:
-            row = exp_df.shape[0]
-            
-            exp_df.loc[row, "Career start date"], exp_df.loc[row, "Career end date"] = transform_date_range(
-                driver.find_element_by_xpath(
-                    experience_x_path + "[" + str(i+1) + "]" 
-                    + "//h4[@class='pv-entity__date-range t-14 t-black--light t-normal']/span[2]"
-                ).text
-            )
+            record = ExpRecord(np.nan, np.nan, np.nan, np.nan, '', np.nan)
+            record.dates = driver.find_element_by_xpath(
+                experience_x_path + "[" + str(i+1) + "]" 
+                + "//h4[@class='pv-entity__date-range t-14 t-black--light t-normal']/span[2]"
+            ).text
+            records.append(record)
             
             # to get the Linkedin url of the company
-            exp_df.loc[row, "Company url"] = driver.find_element_by_xpath(
+            record.company_url = driver.find_element_by_xpath(
                 experience_x_path + "[" + str(i+1) + "]" 
                 + "//a[@data-control-name='background_details_company']"
             ).get_attribute("href")
@@ -654,30 +1316,30 @@ def scrape_exp_indiv(driver, profile_url, reload=True, industries=True):
                         
             # if there is only 1 job position in the company
             if len(sub_exp) == 0:
-                exp_df.loc[row, "Job position"] = driver.find_element_by_xpath(
+                record.position = driver.find_element_by_xpath(
                     experience_x_path + "[" + str(i+1) + "]"
                     + "//h3[@class='t-16 t-black t-bold']"
                 ).text
                 
-                exp_df.loc[row, "Company"] = driver.find_element_by_xpath(
+                record.company = driver.find_element_by_xpath(
                     experience_x_path + "[" + str(i+1) + "]"
                     + "//p[@class='pv-entity__secondary-title t-14 t-black t-normal']"
                 ).text
                 
-                exp_df.loc[row, "Career description"] = driver.find_element_by_xpath(
+                record.description = driver.find_element_by_xpath(
                     experience_x_path + "[" + str(i+1) + "]"
                     + "//div[@class='pv-entity__extra-details t-14 t-black--light ember-view']"
                 ).text
                 
             # if there is more than 1 job position in the company
             else:
-                exp_df.loc[row, "Company"] = driver.find_element_by_xpath(
+                record.company = driver.find_element_by_xpath(
                     experience_x_path + "[" + str(i+1) + "]" 
                     + "//div[@class='pv-entity__company-details']"
                     + "//h3[@class='t-16 t-black t-bold']/span[2]"
                 ).text
                 
-                exp_df.loc[row, "Job position"] = driver.find_element_by_xpath(
+                record.position = driver.find_element_by_xpath(
                     experience_x_path + "[" + str(i+1) + "]" 
                     + "//li" + "[" + str(1) + "]" 
                     + "[@class='pv-entity__position-group-role-item']"
@@ -687,19 +1349,18 @@ def scrape_exp_indiv(driver, profile_url, reload=True, industries=True):
             
             for j in range(1, len(sub_exp)):
                 try:
-                    exp_df.loc[row+j, "Company"] = exp_df.loc[row, "Company"]
-                    exp_df.loc[row+j, "Industry"] = exp_df.loc[row, "Industry"]
-                    exp_df.loc[row+j, "Company url"] = exp_df.loc[row, "Company url"]
-                    exp_df.loc[row+j, "Career start date"], exp_df.loc[row+j, "Career end date"] = transform_date_range(
-                        driver.find_element_by_xpath(
-                            experience_x_path + "[" + str(i+1) + "]" 
-                            + "//li" + "[" + str(j+1) + "]" 
-                            + "[@class='pv-entity__position-group-role-item']"
-                            + "//h4[@class='pv-entity__date-range t-14 t-black--light t-normal']"
-                            + "/span[2]"
-                        ).text)
+                    role = ExpRecord(record.company, record.company_url, record.industry, np.nan, '', np.nan)
+                    records.append(role)
+                    
+                    role.dates = driver.find_element_by_xpath(
+                        experience_x_path + "[" + str(i+1) + "]" 
+                        + "//li" + "[" + str(j+1) + "]" 
+                        + "[@class='pv-entity__position-group-role-item']"
+                        + "//h4[@class='pv-entity__date-range t-14 t-black--light t-normal']"
+                        + "/span[2]"
+                    ).text
                     
-                    exp_df.loc[row+j, "Job position"] = driver.find_element_by_xpath(
+                    role.position = driver.find_element_by_xpath(
                         experience_x_path + "[" + str(i+1) + "]" 
                         + "//li" + "[" + str(j+1) + "]" 
                         + "[@class='pv-entity__position-group-role-item']"
@@ -707,7 +1368,7 @@ def scrape_exp_indiv(driver, profile_url, reload=True, industries=True):
                         + "/span[2]"
                     ).text
                     
-                    exp_df.loc[row+j, "Career description"] = driver.find_element_by_xpath(
+                    role.description = driver.find_element_by_xpath(
                         experience_x_path + "[" + str(i+1) + "]"
                         + "//li" + "[" + str(j+1) + "]"
                         + "//div[@class='pv-entity__extra-details t-14 t-black--light ember-view']"
@@ -716,19 +1377,24 @@ def scrape_exp_indiv(driver, profile_url, reload=True, industries=True):
                     pass
         except:
             pass
+    
+    exp_df = exp_frame(records)
+    
     if industries:
-        exp_df["Industry"] = scrape_industries(driver, exp_df["Company url"])["Industry"]
+        exp_df["Industry"] = scrape_industries(driver, exp_df["Company url"], cache=industry_cache)["Industry"].values
+        # kept object like in exp_frame, pandas 3 would infer str
+        exp_df = exp_df.astype({"Industry": object})
     
     return exp_df
 
-def scrape_skills_indiv(driver, profile_url, reload=True):
+@traced()
+def scrape_skills_indiv(driver, profile_url, reload=True, time_budget=None):
     df = pd.DataFrame(columns = ["Skills"])
     
     if reload:
         # visit the profile url
         driver.get(profile_url)
-        profile_dp_visible(driver)
-        expand_page(driver)
+        expand_page(driver, time_budget)
     
     skills_list = []
     skills = driver.find_elements_by_xpath(
@@ -744,14 +1410,14 @@ def scrape_skills_indiv(driver, profile_url, reload=True):
     return df
 
 # only scrapes the top 6 interests displayed without clicking the 'See all' button
-def scrape_interests_indiv(driver, profile_url, reload=True):
+@traced()
+def scrape_interests_indiv(driver, profile_url, reload=True, time_budget=None):
     df = pd.DataFrame(columns = ["Interests"])
     
     if reload:
         # visit the profile url
         driver.get(profile_url)
-        profile_dp_visible(driver)
-        expand_page(driver)
+        expand_page(driver, time_budget)
         
     interests_list = []
     
@@ -768,6 +1434,7 @@ def scrape_interests_indiv(driver, profile_url, reload=True):
     df.loc[0, 'Interests'] = ';'.join(interests_list)
     return df
 
+@traced()
 def scrape_industry(driver, company_url):
     if type(company_url) != str:
         return np.nan
@@ -776,7 +1443,7 @@ def scrape_industry(driver, company_url):
         return "Academia/Education"
     elif company_url[:33]  == 'https://www.linkedin.com/company/':
         driver.get(company_url + "about/")
-        if company_dp_visible:
+        if company_dp_visible(driver):
             org_info = driver.find_elements_by_xpath(
                 "//dt[@class='org-page-details__definition-term t-14 t-black t-bold']"
             )
@@ -789,32 +1456,285 @@ def scrape_industry(driver, company_url):
             
     return np.nan
 
-def scrape_industries(driver, company_urls):
+# each distinct url is scraped once per batch, and not at all if it is in the cache
+@traced()
+def scrape_industries(driver, company_urls, cache=None):
     df = pd.DataFrame(columns = ["url", "Industry"])
-    df["url"] = company_urls
+    df["url"] = list(company_urls)
+    
+    industries = {}
+    for url in df["url"]:
+        if type(url) != str:
+            continue
+        
+        key = normalize_company_url(url)
+        if key in industries:
+            continue
+        
+        if cache is not None:
+            found, industry = cache.get(url)
+            if found:
+                industries[key] = industry if industry is not None else np.nan
+                continue
+        
+        industries[key] = scrape_industry(driver, key)
+        if cache is not None:
+            cache.set(url, industries[key])
+    
+    df["Industry"] = [industries[normalize_company_url(url)] if type(url) == str else np.nan
+                      for url in df["url"]]
+    
+    return df
+
+
+
+# ### Page source scraping functions
+# Counterparts of the scrape_*_indiv functions that work on a single snapshot of `driver.page_source`.
+# The page is fetched from the driver once and every section is parsed locally with lxml,
+# instead of doing one WebDriver round trip per field. They can be run offline against saved HTML files.
+
+# In[11]:
+
+
+# XPaths are compiled once and evaluated relative to the profile page or to a section entry
+NAME_XPATH = etree.XPath("//ul[@class='pv-top-card--list inline-flex align-items-center']//li")
+
+EDU_ENTRY_XPATH = etree.XPath(
+    "//section[@id='education-section']//ul/li[.//div[@class='pv-entity__degree-info']/h3]"
+)
+EDU_SCHOOL_XPATH = etree.XPath(".//div[@class='pv-entity__degree-info']/h3")
+EDU_DEGREE_XPATH = etree.XPath(
+    ".//div[@class='pv-entity__degree-info']"
+    + "//p[@class='pv-entity__secondary-title pv-entity__degree-name t-14 t-black t-normal']/span[2]"
+)
+EDU_MAJOR_XPATH = etree.XPath(
+    ".//div[@class='pv-entity__degree-info']"
+    + "//p[@class='pv-entity__secondary-title pv-entity__fos t-14 t-black t-normal']/span[2]"
+)
+EDU_DATES_XPATH = etree.XPath(".//p[@class='pv-entity__dates t-14 t-black--light t-normal']/span[2]")
+EDU_ACTIVITIES_XPATH = etree.XPath(".//p[@class='pv-entity__secondary-title t-14 t-black--light t-normal']/span[2]")
+EDU_DESCRIPTION_XPATH = etree.XPath(".//div[@class='pv-entity__extra-details t-14 t-black--light ember-view']")
+
+EXP_ENTRY_XPATH = etree.XPath("//section[@id='experience-section']/ul/li")
+EXP_DATES_XPATH = etree.XPath(".//h4[@class='pv-entity__date-range t-14 t-black--light t-normal']/span[2]")
+EXP_COMPANY_URL_XPATH = etree.XPath(".//a[@data-control-name='background_details_company']/@href")
+EXP_ROLE_XPATH = etree.XPath(".//li[@class='pv-entity__position-group-role-item']")
+EXP_POSITION_XPATH = etree.XPath(".//h3[@class='t-16 t-black t-bold']")
+EXP_COMPANY_XPATH = etree.XPath(".//p[@class='pv-entity__secondary-title t-14 t-black t-normal']")
+EXP_DESCRIPTION_XPATH = etree.XPath(".//div[@class='pv-entity__extra-details t-14 t-black--light ember-view']")
+EXP_GROUP_COMPANY_XPATH = etree.XPath(
+    ".//div[@class='pv-entity__company-details']//h3[@class='t-16 t-black t-bold']/span[2]"
+)
+EXP_ROLE_POSITION_XPATH = etree.XPath(".//h3[@class='t-14 t-black t-bold']/span[2]")
+
+SKILLS_XPATH = etree.XPath("//span[@class='pv-skill-category-entity__name-text t-16 t-black t-bold']")
+INTERESTS_XPATH = etree.XPath(
+    "//section[@class='pv-profile-section pv-interests-section artdeco-container-card artdeco-card ember-view']"
+    + "//li//h3"
+)
+
+# WebElement.text only has the rendered text of an element, these are left out of element_text
+HIDDEN_TAGS = {'head', 'script', 'style', 'template', 'noscript'}
+# classes hidden by LinkedIn's stylesheet, e.g. the "... see more" of a collapsed description
+HIDDEN_CLASSES = {'lt-line-clamp__ellipsis--dummy'}
+# elements starting a new line of text
+BLOCK_TAGS = {'address', 'article', 'br', 'dd', 'div', 'dl', 'dt', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+              'header', 'hr', 'li', 'ol', 'p', 'section', 'table', 'tr', 'ul'}
+
+# check if an lxml element is left out of WebElement.text, like comments are
+def is_hidden(element):
+    if not isinstance(element.tag, str) or element.tag in HIDDEN_TAGS:
+        return True
+    if element.get('hidden') is not None:
+        return True
+    
+    style = element.get('style', '').replace(' ', '').lower()
+    if 'display:none' in style or 'visibility:hidden' in style:
+        return True
+    
+    return not HIDDEN_CLASSES.isdisjoint(element.get('class', '').split())
+
+# appends the pieces of visible text of an element and its children to parts, in document order
+def visible_text_parts(element, parts):
+    if is_hidden(element):
+        return
+    
+    block = element.tag in BLOCK_TAGS
+    if block:
+        parts.append('\n')
+    if element.text:
+        parts.append(element.text)
+    
+    for child in element:
+        visible_text_parts(child, parts)
+        # the text after a hidden child is still visible
+        if child.tail:
+            parts.append(child.tail)
+    
+    if block:
+        parts.append('\n')
+
+# visible text of an lxml element, with the whitespace collapsed and block elements on their own lines
+# like in WebElement.text
+def element_text(element):
+    parts = []
+    visible_text_parts(element, parts)
+    
+    lines = [" ".join(line.split()) for line in "".join(parts).splitlines()]
+    return "\n".join(line for line in lines if line != '')
+
+# text of the first element matched by a compiled xpath, np.nan if nothing matches
+def first_text(element, xpath):
+    matches = xpath(element)
+    if len(matches) == 0:
+        return np.nan
+    return element_text(matches[0])
+
+def scrape_name_source(tree):
+    df = pd.DataFrame(columns = ["Name"])
+    
+    names = NAME_XPATH(tree)
+    if len(names) != 0:
+        df.loc[0, 'Name'] = element_text(names[0])
+        
+    return df
+
+def scrape_edu_source(tree):
+    records = []
+    
+    for entry in EDU_ENTRY_XPATH(tree):
+        dates = first_text(entry, EDU_DATES_XPATH)
+        
+        records.append(EduRecord(
+            school = first_text(entry, EDU_SCHOOL_XPATH),
+            degree_type = first_text(entry, EDU_DEGREE_XPATH),
+            major = first_text(entry, EDU_MAJOR_XPATH),
+            dates = dates if type(dates) == str else '',
+            activities = first_text(entry, EDU_ACTIVITIES_XPATH),
+            description = first_text(entry, EDU_DESCRIPTION_XPATH),
+        ))
+        
+    return edu_frame(records)
+
+def scrape_exp_source(tree, profile_url):
+    records = []
+    
+    for entry in EXP_ENTRY_XPATH(tree):
+        dates = first_text(entry, EXP_DATES_XPATH)
+        if type(dates) != str:
+            continue
+        
+        # like scrape_exp_indiv, an entry without a company link is kept with its dates only
+        company_urls = EXP_COMPANY_URL_XPATH(entry)
+        if len(company_urls) == 0:
+            records.append(ExpRecord(np.nan, np.nan, np.nan, np.nan, dates, np.nan))
+            continue
+        
+        # hrefs in the page source may be relative, unlike WebElement.get_attribute("href")
+        company_url = urljoin(profile_url, company_urls[0])
+        
+        # check if there are another jobs done under the same company
+        sub_exp = EXP_ROLE_XPATH(entry)
+        
+        # if there is only 1 job position in the company
+        if len(sub_exp) == 0:
+            records.append(ExpRecord(
+                company = first_text(entry, EXP_COMPANY_XPATH),
+                company_url = company_url,
+                industry = np.nan,
+                position = first_text(entry, EXP_POSITION_XPATH),
+                dates = dates,
+                description = first_text(entry, EXP_DESCRIPTION_XPATH),
+            ))
+            continue
+        
+        # if there is more than 1 job position in the company
+        company = first_text(entry, EXP_GROUP_COMPANY_XPATH)
+        records.append(ExpRecord(
+            company = company,
+            company_url = company_url,
+            industry = np.nan,
+            position = first_text(sub_exp[0], EXP_ROLE_POSITION_XPATH),
+            dates = dates,
+            description = np.nan,
+        ))
+        
+        for role in sub_exp[1:]:
+            dates = first_text(role, EXP_DATES_XPATH)
+            
+            records.append(ExpRecord(
+                company = company,
+                company_url = company_url,
+                industry = np.nan,
+                position = first_text(role, EXP_ROLE_POSITION_XPATH),
+                dates = dates if type(dates) == str else '',
+                description = first_text(role, EXP_DESCRIPTION_XPATH),
+            ))
+    
+    return exp_frame(records)
+
+def scrape_skills_source(tree):
+    df = pd.DataFrame(columns = ["Skills"])
     
-    industries = [scrape_industry(driver, url) for url in company_urls]
-    df["Industry"] = industries
+    skills_list = [element_text(skill) for skill in SKILLS_XPATH(tree)]
+    df.loc[0, 'Skills'] = ';'.join(skill for skill in skills_list if skill != '')
     
     return df
 
+def scrape_interests_source(tree):
+    df = pd.DataFrame(columns = ["Interests"])
+    
+    interests_list = [element_text(interest) for interest in INTERESTS_XPATH(tree)]
+    df.loc[0, 'Interests'] = ';'.join(interest for interest in interests_list if interest != '')
+    
+    return df
+
+# parses a saved or freshly grabbed profile page source into the name, edu, exp, skills and interests dataframes
+@traced()
+def parse_profile_source(page_source, profile_url):
+    tree = html.document_fromstring(page_source)
+    
+    return (scrape_name_source(tree), scrape_edu_source(tree), scrape_exp_source(tree, profile_url),
+            scrape_skills_source(tree), scrape_interests_source(tree))
+
+# visits and expands a profile page, then takes a single snapshot of its source
+@traced()
+def scrape_profile_source(driver, profile_url, time_budget=None):
+    driver.get(profile_url)
+    expand_page(driver, time_budget)
+    
+    return parse_profile_source(driver.page_source, profile_url)
+
+
+# ### Profile scraping
+
+# In[12]:
+
+
 # selects the first job after the NUS Bachelor's for career data and selects NUS Bachelor's for edu data
-def scrape_profile(driver, profile_url):
-    name_df = scrape_name_indiv(driver, profile_url, reload=True)
-    edu_df = scrape_edu_indiv(driver, profile_url, reload=False)
-    exp_df = scrape_exp_indiv(driver, profile_url, reload=False, industries=False)
-    skills_df = scrape_skills_indiv(driver, profile_url, reload=False)
-    interests_df = scrape_interests_indiv(driver, profile_url, reload=False)
+# from_source=True parses one snapshot of the page source instead of querying the driver field by field
+# time_budget is the no. of seconds the page is given to show the profile and its "Show more" buttons,
+# PROFILE_TIME_BUDGET by default
+@traced()
+def scrape_profile(driver, profile_url, from_source=False, industry_cache=None, time_budget=None):
+    if from_source:
+        name_df, edu_df, exp_df, skills_df, interests_df = scrape_profile_source(driver, profile_url, time_budget)
+    else:
+        name_df = scrape_name_indiv(driver, profile_url, reload=True, time_budget=time_budget)
+        edu_df = scrape_edu_indiv(driver, profile_url, reload=False)
+        exp_df = scrape_exp_indiv(driver, profile_url, reload=False, industries=False)
+        skills_df = scrape_skills_indiv(driver, profile_url, reload=False)
+        interests_df = scrape_interests_indiv(driver, profile_url, reload=False)
     
     first_job_df = pd.DataFrame(columns=exp_df.columns)
     
-    time.sleep(0.1)
-    
     nus_df = is_NUS_Bachelor(edu_df)
     if not nus_df.empty:
         first_job_df = get_first_job(exp_df, nus_df.loc[0,"Degree end year"])
     if not first_job_df.empty:
-        exp_df["Industry"] = scrape_industries(driver, first_job_df.loc[0, "Company url"])["Industry"]
+        first_job_df = first_job_df.assign(Industry = scrape_industries(
+            driver, first_job_df["Company url"], cache=industry_cache
+        )["Industry"].values).astype({"Industry": object})
     
     df_list = [name_df.reset_index(), nus_df.reset_index(), first_job_df.reset_index(),
                skills_df.reset_index(), interests_df.reset_index()]
@@ -823,15 +1743,368 @@ def scrape_profile(driver, profile_url):
     
     return profile_df.drop(columns = "index")
 
-def scrape_all_profiles(driver, profile_url):
+# with a checkpoint_path every profile is appended to a JSON lines file as soon as it is scraped,
+# and resume=True skips the urls already in that file
+# trace=True times every stage and prints a summary at the end, trace_path also writes a Chrome trace
+# time_budget is passed on to scrape_profile
+def scrape_all_profiles(driver, profile_url, from_source=False, industry_cache=None,
+                        checkpoint_path=None, resume=False, trace=False, trace_path=None, time_budget=None):
+    if trace:
+        tracer.reset()
+        tracer.enabled = True
+        driver = TracedDriver(driver)
+    
+    checkpoint = None
+    skip_urls = set()
+    if checkpoint_path is not None:
+        if resume:
+            skip_urls = checkpoint_urls(checkpoint_path)
+        checkpoint = CheckpointWriter(checkpoint_path, resume=resume)
+    
     counter = 1
-    profiles_df = pd.DataFrame()
-    for url in profile_url:
-        print("Scraping profile #" + str(counter) + ": " + url + " " * 20, "\r", end="")
-        counter += 1
+    profile_dfs = []
+    try:
+        for url in profile_url:
+            if url in skip_urls:
+                continue
+            
+            print("Scraping profile #" + str(counter) + ": " + url + " " * 20, "\r", end="")
+            counter += 1
+            tracer.set_profile(url)
+
+            profile_df = scrape_profile(driver, url, from_source=from_source, industry_cache=industry_cache,
+                                        time_budget=time_budget)
+            profile_df['url'] = pd.Series(url, index=profile_df.index, dtype=object)
+            
+            if checkpoint is not None:
+                checkpoint.write(profile_df)
+            else:
+                profile_dfs.append(profile_df)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+        
+        if trace:
+            tracer.enabled = False
+            print(tracer.summary().to_string())
+            if trace_path is not None:
+                tracer.write_chrome_trace(trace_path)
+    
+    if checkpoint is not None:
+        return compact_checkpoint(checkpoint_path)
+    
+    if len(profile_dfs) == 0:
+        return pd.DataFrame()
+    
+    # build the dataframe once instead of concatenating after every profile
+    return pd.concat(profile_dfs, axis=0).reset_index(drop=True)
+
 
-        profile_df = scrape_profile(driver, url)
-        profile_df['url'] = url
-        profiles_df = pd.concat([profiles_df, profile_df], axis=0)
+# ### Checkpointing
+# Scraped profiles are appended to a JSON lines file, one line per row, so that a crash loses at most
+# the profile being scraped and a crawl can be resumed. The file is compacted into a DataFrame at the end.
+
+# In[13]:
+
+
+DATE_COLUMNS = ["Degree start year", "Degree end year", "Career start date", "Career end date"]
+BOOLEAN_COLUMNS = ["Graduated", "Career ongoing"]
+
+class CheckpointWriter():
+    """Append-only JSON lines writer for scraped profiles"""
+    
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.lock = threading.Lock()
+        
+        # a crash can leave half a line behind, start on a new line after it
+        needs_newline = False
+        if resume and os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as file:
+                file.seek(-1, os.SEEK_END)
+                needs_newline = file.read(1) != b'\n'
+        
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+        if needs_newline:
+            self.file.write('\n')
+    
+    def write(self, profile_df):
+        """Append the rows of a scraped profile and flush them to disk"""
+        lines = profile_df.to_json(orient='records', lines=True, date_format='iso').rstrip('\n')
+        if lines == '':
+            return
+        
+        with self.lock:
+            self.file.write(lines + '\n')
+            self.file.flush()
+            os.fsync(self.file.fileno())
+    
+    def close(self):
+        self.file.close()
+
+# urls of the profiles already in a checkpoint file, skipping a line cut off by a crash
+def checkpoint_urls(path):
+    urls = set()
+    if not os.path.exists(path):
+        return urls
+    
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            try:
+                urls.add(json.loads(line)['url'])
+            except (ValueError, KeyError):
+                continue
+    
+    return urls
+
+# builds the dataframe of all the profiles in a checkpoint file at once
+def compact_checkpoint(path):
+    records = []
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    
+    # object columns like the frames scraped in memory, pandas 3 would infer str
+    profiles_df = pd.DataFrame.from_records(records).astype(object)
+    
+    # dates were written as ISO strings
+    for column in DATE_COLUMNS:
+        if column in profiles_df.columns:
+            profiles_df[column] = pd.to_datetime(profiles_df[column], errors='coerce').astype('datetime64[ns]')
+    
+    # flags were written as true, false or null, cast back to the nullable boolean dtype of the frames
+    for column in BOOLEAN_COLUMNS:
+        if column in profiles_df.columns:
+            profiles_df[column] = profiles_df[column].astype('boolean')
+    
+    return profiles_df
+
+
+# ### Parallel scraping
+# Scrapes the profiles with a pool of browsers. Each worker thread owns its own WebDriver session,
+# so every browser has its own login and cookies, and takes profile urls from a shared work queue.
+
+# In[14]:
+
+
+# quit a browser, ignoring the error of a session that is already dead
+def quit_driver(driver):
+    if driver is None:
+        return
+    
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+# make_driver: function returning a new WebDriver, e.g. lambda: webdriver.Chrome(executable_path=chrome_driver_path)
+# a profile that fails is put back on the queue until it has been retried `retries` times
+# a browser failing `restart_after` profiles in a row, e.g. because its session died, is replaced by a new one
+# from make_driver, and a worker retires when its browser has been replaced `max_restarts` times
+# checkpoint_path, resume, trace, trace_path and time_budget work like in scrape_all_profiles
+def scrape_all_profiles_pool(make_driver, profile_url, n_workers=4, retries=2, log_in=True, from_source=False,
+                             industry_cache=None, checkpoint_path=None, resume=False, trace=False, trace_path=None,
+                             time_budget=None, restart_after=3, max_restarts=2):
+    if trace:
+        tracer.reset()
+        tracer.enabled = True
+    
+    checkpoint = None
+    skip_urls = set()
+    if checkpoint_path is not None:
+        if resume:
+            skip_urls = checkpoint_urls(checkpoint_path)
+        checkpoint = CheckpointWriter(checkpoint_path, resume=resume)
+    
+    url_queue = queue.Queue()
+    for index, url in enumerate(profile_url):
+        if url not in skip_urls:
+            url_queue.put((index, url, 0))
+    
+    # ask for the credentials once and log in every browser with them
+    email, password = None, None
+    if log_in:
+        email = input("Please enter your Linkedin username: ")
+        password = getpass.getpass("Please enter your Linkedin password: ")
+    
+    results = {}
+    failed = {}
+    lock = threading.Lock()
+    counter = [0]
+    
+    def start_driver():
+        driver = make_driver()
+        if trace:
+            driver = TracedDriver(driver)
+        
+        try:
+            if log_in:
+                login(driver, email, password)
+        except:
+            quit_driver(driver)
+            raise
         
-    return profiles_df.reset_index().drop(columns = "index")
\ No newline at end of file
+        return driver
+    
+    def worker():
+        driver = None
+        starts = 0
+        failures = 0 # profiles failed in a row by the current browser
+        try:
+            while True:
+                if driver is None:
+                    if starts > max_restarts:
+                        print("A worker retired after replacing its browser " + str(max_restarts) + " times")
+                        return
+                    
+                    starts += 1
+                    failures = 0
+                    try:
+                        driver = start_driver()
+                    except Exception as error:
+                        print("Failed to start a browser: " + repr(error))
+                        continue
+                
+                try:
+                    index, url, attempt = url_queue.get_nowait()
+                except queue.Empty:
+                    return
+                
+                tracer.set_profile(url)
+                try:
+                    profile_df = scrape_profile(driver, url, from_source=from_source,
+                                                industry_cache=industry_cache, time_budget=time_budget)
+                    profile_df['url'] = pd.Series(url, index=profile_df.index, dtype=object)
+                    
+                    if checkpoint is not None:
+                        checkpoint.write(profile_df)
+                    
+                    with lock:
+                        if checkpoint is None:
+                            results[index] = profile_df
+                        counter[0] += 1
+                        print("Scraped profile #" + str(counter[0]) + ": " + url + " " * 20, "\r", end="")
+                    failures = 0
+                except Exception as error:
+                    if attempt < retries:
+                        url_queue.put((index, url, attempt + 1))
+                    else:
+                        with lock:
+                            failed[url] = repr(error)
+                    
+                    failures += 1
+                    if failures >= restart_after:
+                        quit_driver(driver)
+                        driver = None
+        finally:
+            quit_driver(driver)
+    
+    threads = [threading.Thread(target=worker, daemon=True) for i in range(min(n_workers, url_queue.qsize()))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    if checkpoint is not None:
+        checkpoint.close()
+    
+    if trace:
+        tracer.enabled = False
+        print(tracer.summary().to_string())
+        if trace_path is not None:
+            tracer.write_chrome_trace(trace_path)
+    
+    # urls left on the queue if every browser failed to start
+    while not url_queue.empty():
+        index, url, attempt = url_queue.get_nowait()
+        failed[url] = "no worker left to scrape it"
+    
+    print("Profiles scraped:", counter[0], " " * 20)
+    for url, error in failed.items():
+        print("Failed to scrape " + url + ": " + error)
+    
+    if checkpoint is not None:
+        # the checkpoint is in the order the profiles finished, put them back in the order of the urls
+        order = {url: index for index, url in enumerate(profile_url)}
+        profiles_df = compact_checkpoint(checkpoint_path)
+        if profiles_df.empty:
+            return profiles_df
+        profiles_df = profiles_df.sort_values("url", key=lambda urls: urls.map(order), kind="stable")
+        return profiles_df.reset_index(drop=True)
+    
+    if len(results) == 0:
+        return pd.DataFrame()
+    
+    # merge the results in the order of the given urls
+    profiles_df = pd.concat([results[index] for index in sorted(results)], axis=0)
+    
+    return profiles_df.reset_index(drop=True)
+
+
+# ### Benchmarks
+
+# In[15]:
+
+
+# time to build the edu and exp dataframes of a profile cell by cell with df.loc, as the scraping
+# functions used to, against building them once from records
+def benchmark_profile_frames(n_profiles=200, n_rows=10):
+    edu = EduRecord('National University of Singapore', 'Bachelor of Science', 'Mathematics',
+                    '2014 – 2018', np.nan, np.nan)
+    exp = ExpRecord('Acme', 'https://www.linkedin.com/company/acme/', np.nan, 'Engineer',
+                    'Jul 2018 – Present', 'Built things')
+    
+    start = time.perf_counter()
+    for k in range(n_profiles):
+        df = pd.DataFrame(columns = EDU_COLUMNS)
+        for i in range(n_rows):
+            df.loc[i, 'School'] = edu.school
+            df.loc[i, 'Degree type'] = edu.degree_type
+            df.loc[i, 'Major'] = edu.major
+            df.loc[i, 'Degree start year'], df.loc[i, 'Degree end year'] = transform_date_range(edu.dates, degree=True)
+            df.loc[i, 'Activities and societies'] = edu.activities
+            df.loc[i, 'Edu description'] = edu.description
+            df.loc[i, 'Graduated'] = has_graduated(df.loc[i, 'Degree end year'])
+        
+        exp_df = pd.DataFrame(columns = EXP_COLUMNS)
+        for row in range(n_rows):
+            exp_df.loc[row, "Career start date"], exp_df.loc[row, "Career end date"] = transform_date_range(exp.dates)
+            exp_df.loc[row, "Company url"] = exp.company_url
+            exp_df.loc[row, "Job position"] = exp.position
+            exp_df.loc[row, "Company"] = exp.company
+            exp_df.loc[row, "Career description"] = exp.description
+    before = (time.perf_counter() - start) / n_profiles
+    
+    start = time.perf_counter()
+    for k in range(n_profiles):
+        edu_frame([edu] * n_rows)
+        exp_frame([exp] * n_rows)
+    after = (time.perf_counter() - start) / n_profiles
+    
+    print("df.loc: {:.2f} ms per profile, records: {:.2f} ms per profile, {:.1f}x faster".format(
+        before * 1000, after * 1000, before / after))
+    
+    return pd.DataFrame({"Seconds per profile": [before, after]}, index = ["df.loc", "records"])
+
+# throughput of parse_date_ranges on n archived-like date range strings
+def benchmark_date_parsing(n=1000000, seed=0):
+    rng = np.random.default_rng(seed)
+    months = np.array(list(MONTH_NUMBERS.keys()))
+    years = rng.integers(1980, 2021, size=n)
+    date_strs = np.where(
+        rng.random(n) < 0.5,
+        np.char.add(np.char.add(np.char.add(np.char.capitalize(rng.choice(months, size=n)), " "),
+                                years.astype(str)), " – Present"),
+        np.char.add(np.char.add(years.astype(str), " – "), (years + 4).astype(str))
+    )
+    
+    start = time.perf_counter()
+    parse_date_ranges(date_strs, degree=True)
+    seconds = time.perf_counter() - start
+    
+    print("{:,} date ranges parsed in {:.2f} s ({:,.0f} per second)".format(n, seconds, n / seconds))
+    
+    return seconds
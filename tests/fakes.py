@@ -0,0 +1,151 @@
+"""Stand-ins for a Selenium WebDriver, answering its queries from html parsed with lxml,
+and a local HTTP server standing in for linkedin.com"""
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urljoin
+
+from lxml import html
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+
+import linkedIn_web_scraper as scraper
+
+
+class FakeElement(WebElement):
+    """WebElement of an lxml element, its text is the visible text of the element"""
+
+    def __init__(self, element, base_url):
+        self._id = id(element)
+        self.element = element
+        self.base_url = base_url
+
+    @property
+    def text(self):
+        return scraper.element_text(self.element)
+
+    def get_attribute(self, name):
+        value = self.element.get(name)
+        # like a browser, WebElement.get_attribute gives absolute urls
+        if name == 'href' and value is not None:
+            return urljoin(self.base_url, value)
+        return value
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        pass
+
+
+class LxmlDriver():
+    """WebDriver of a static page"""
+
+    def __init__(self, page_source='<html></html>', url='about:blank'):
+        self.quit_called = False
+        self.load(page_source, url)
+
+    def load(self, page_source, url):
+        self.page_source = page_source
+        self.current_url = url
+        self.tree = html.document_fromstring(page_source)
+
+    def find_elements_by_xpath(self, xpath):
+        return [FakeElement(element, self.current_url) for element in self.tree.xpath(xpath)]
+
+    def find_element_by_xpath(self, xpath):
+        elements = self.find_elements_by_xpath(xpath)
+        if len(elements) == 0:
+            raise NoSuchElementException("No element matches " + xpath)
+        return elements[0]
+
+    def find_elements_by_id(self, element_id):
+        return self.find_elements_by_xpath("//*[@id='" + element_id + "']")
+
+    def find_elements(self, by=By.ID, value=None):
+        if by == By.XPATH:
+            return self.find_elements_by_xpath(value)
+        if by == By.ID:
+            return self.find_elements_by_id(value)
+        if by == By.CLASS_NAME:
+            return self.find_elements_by_xpath("//*[contains(concat(' ', @class, ' '), ' " + value + " ')]")
+        raise NotImplementedError(by)
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if len(elements) == 0:
+            raise NoSuchElementException("No element matches " + value)
+        return elements[0]
+
+    def execute_script(self, script, *args):
+        if script == scraper.PROBE_SCRIPT:
+            return {name: len(self.tree.xpath(xpath)) != 0 for name, xpath in args[0].items()}
+        if script == scraper.CLICK_SCRIPT:
+            return len(self.tree.xpath(args[0])) != 0
+        # scrolling
+        return None
+
+    def quit(self):
+        self.quit_called = True
+
+
+class HTTPDriver(LxmlDriver):
+    """WebDriver loading its pages from a stand-in server, linkedin.com urls are sent to server_url"""
+
+    def __init__(self, server_url):
+        super().__init__()
+        self.server_url = server_url
+
+    def get(self, url):
+        local_url = url.replace('https://www.linkedin.com', self.server_url, 1)
+        with urllib.request.urlopen(local_url, timeout=5) as response:
+            self.load(response.read().decode('utf-8'), url)
+
+
+class DeadDriver(LxmlDriver):
+    """WebDriver whose browser session has died"""
+
+    def get(self, url):
+        raise WebDriverException("invalid session id")
+
+    def quit(self):
+        self.quit_called = True
+        raise WebDriverException("invalid session id")
+
+
+class StandInServer():
+    """HTTP server on a free local port, serving the page of route(path) or a 404 when it is None
+
+    Used as a context manager, the server runs in a background thread and its address is in `url`.
+    """
+
+    def __init__(self, route):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                page = route(self.path)
+                if page is None:
+                    self.send_error(404)
+                    return
+
+                body = page.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:' + str(self.server.server_address[1])
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
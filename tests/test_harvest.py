@@ -0,0 +1,91 @@
+import asyncio
+import json
+from collections import Counter
+from html import escape
+
+import pytest
+
+import linkedIn_web_scraper as scraper
+
+# harvest_page_links is the only part of the scraper that needs aiohttp, which is optional
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+
+def search_page(page, n_pages=3):
+    """Search results page with 2 results, the first page after n_pages only has the nav bar link to the user"""
+    nav = '<header class="global-nav"><a href="/in/logged-in-user/">Me</a></header>'
+    if page > n_pages:
+        return '<html><body>' + nav + '<p>No results found</p></body></html>'
+
+    slugs = ['person-' + str(page) + '-a', 'person-' + str(page) + '-b']
+    if page % 2 == 1:
+        results = ''.join('<li><a data-control-name="search_srp_result" href="/in/' + slug + '/">' + slug + '</a></li>'
+                          for slug in slugs)
+        return '<html><body>' + nav + '<ul class="search-results">' + results + '</ul></body></html>'
+
+    # results embedded as json, with the logged in user's mini profile next to them
+    data = {'included': [
+        {'$type': 'com.linkedin.voyager.identity.shared.MiniProfile', 'publicIdentifier': 'logged-in-user',
+         'navigationUrl': 'https://www.linkedin.com/in/logged-in-user'},
+    ] + [
+        {'$type': 'com.linkedin.voyager.dash.search.EntityResultViewModel',
+         'navigationUrl': 'https://www.linkedin.com/in/' + slug + '?miniProfileUrn=urn'} for slug in slugs
+    ]}
+    return '<html><body>' + nav + '<code style="display: none">' + escape(json.dumps(data)) + '</code></body></html>'
+
+
+async def harvest_from_fake_search_server(respond, **kwargs):
+    """Run harvest_page_links against a local search server answering respond(page, no. of requests of the page)"""
+    requests = Counter()
+
+    async def search(request):
+        page = int(request.query['page'])
+        requests[page] += 1
+        return respond(page, requests[page])
+
+    app = web.Application()
+    app.router.add_get('/search/results/people/', search)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    url = 'http://127.0.0.1:' + str(runner.addresses[0][1]) + '/search/results/people/?keywords=nus'
+
+    try:
+        await scraper.harvest_page_links(url, cookies={'li_at': 'session'}, backoff=0, **kwargs)
+    finally:
+        await runner.cleanup()
+
+    return requests
+
+
+def test_harvest_page_links_from_a_fake_search_server():
+    # the second page is rate limited the first time it is asked for
+    def respond(page, n_requests):
+        if page == 2 and n_requests == 1:
+            return web.Response(status=429, headers={'Retry-After': '0'})
+        return web.Response(text=search_page(page), content_type='text/html')
+
+    links_dict = {}
+    requests = asyncio.run(harvest_from_fake_search_server(respond, pages='all', concurrency=2,
+                                                           links_dict=links_dict))
+
+    assert list(links_dict) == ['https://www.linkedin.com/in/person-' + str(page) + '-' + person + '/'
+                                for page in [1, 2, 3] for person in ['a', 'b']]
+    assert requests == Counter({1: 1, 2: 2, 3: 1, 4: 1})
+
+
+def test_harvest_page_links_raises_when_a_page_keeps_failing():
+    def respond(page, n_requests):
+        if page == 2:
+            return web.Response(status=503)
+        return web.Response(text=search_page(page), content_type='text/html')
+
+    links_dict = {}
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(harvest_from_fake_search_server(respond, pages=5, concurrency=1, links_dict=links_dict,
+                                                    retries=2))
+
+    # the links of the pages before the failed one are kept
+    assert list(links_dict) == ['https://www.linkedin.com/in/person-1-a/', 'https://www.linkedin.com/in/person-1-b/']
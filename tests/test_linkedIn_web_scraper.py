@@ -0,0 +1,373 @@
+import os
+import time
+
+import numpy as np
+import pytest
+import pandas as pd
+import pandas.testing as pdt
+
+import linkedIn_web_scraper as scraper
+from fakes import DeadDriver, HTTPDriver, LxmlDriver, StandInServer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PROFILE_URL = 'https://www.linkedin.com/in/jane-tan/'
+
+# the scraper builds its text columns with the object dtype and its dates in ns,
+# where pandas 3 would infer str and us
+EDU_TEXT_COLUMNS = ['School', 'Degree type', 'Major', 'Activities and societies', 'Edu description']
+EXP_TEXT_COLUMNS = ['Company', 'Company url', 'Industry', 'Job position', 'Career description']
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as file:
+        return file.read()
+
+
+def expected_edu_df():
+    return pd.DataFrame({
+        'School': ['National University of Singapore', 'Raffles Junior College'],
+        'Degree type': ['Bachelor of Science - BS', np.nan],
+        'Major': ['Statistics', np.nan],
+        'Degree start year': pd.to_datetime(['2014-08-01', '2012-08-01']).astype('datetime64[ns]'),
+        'Degree end year': pd.to_datetime(['2018-06-01', '2013-06-01']).astype('datetime64[ns]'),
+        'Graduated': pd.array([True, True], dtype='boolean'),
+        'Activities and societies': ['Statistics Society', np.nan],
+        'Edu description': ["Dean's List", np.nan],
+    }, columns = scraper.EDU_COLUMNS).astype(dict.fromkeys(EDU_TEXT_COLUMNS, object))
+
+
+def expected_exp_df():
+    return pd.DataFrame({
+        'Company': ['Acme Analytics', 'Globex', 'Globex', np.nan],
+        'Company url': ['https://www.linkedin.com/company/acme-analytics/', 'https://www.linkedin.com/company/globex/',
+                        'https://www.linkedin.com/company/globex/', np.nan],
+        'Industry': [np.nan] * 4,
+        'Job position': ['Data Scientist', 'Analyst', 'Intern', np.nan],
+        'Career start date': pd.to_datetime(['2018-07-01', '2017-01-01', '2016-05-01', '2015-01-01'])
+                             .astype('datetime64[ns]'),
+        'Career end date': pd.to_datetime([None, '2018-06-01', '2016-08-01', '2016-01-01']).astype('datetime64[ns]'),
+        'Career ongoing': pd.array([True, False, False, False], dtype='boolean'),
+        'Career description': ['Built forecasting models.\nLed a team of three.', np.nan, 'Dashboards.', np.nan],
+    }, columns = scraper.EXP_COLUMNS).astype(dict.fromkeys(EXP_TEXT_COLUMNS, object))
+
+
+def test_parse_profile_source_matches_expected_frames():
+    name_df, edu_df, exp_df, skills_df, interests_df = parse_fixture_profile()
+
+    assert name_df.loc[0, 'Name'] == 'Jane Tan'
+    pdt.assert_frame_equal(edu_df, expected_edu_df())
+    pdt.assert_frame_equal(exp_df, expected_exp_df())
+    assert skills_df.loc[0, 'Skills'] == 'Python;Machine Learning;SQL'
+    assert interests_df.loc[0, 'Interests'] == 'National University of Singapore;Andrew Ng'
+
+
+def test_source_and_indiv_modes_give_the_same_frames():
+    driver = LxmlDriver(read_fixture('profile.html'), PROFILE_URL)
+    source_dfs = parse_fixture_profile()
+
+    indiv_dfs = (
+        scraper.scrape_name_indiv(driver, PROFILE_URL, reload=False),
+        scraper.scrape_edu_indiv(driver, PROFILE_URL, reload=False),
+        scraper.scrape_exp_indiv(driver, PROFILE_URL, reload=False, industries=False),
+        scraper.scrape_skills_indiv(driver, PROFILE_URL, reload=False),
+        scraper.scrape_interests_indiv(driver, PROFILE_URL, reload=False),
+    )
+
+    for source_df, indiv_df in zip(source_dfs, indiv_dfs):
+        pdt.assert_frame_equal(source_df, indiv_df)
+
+
+def test_element_text_leaves_out_hidden_text():
+    tree = scraper.html.fragment_fromstring(
+        '<div><p>First line<br>second <b>line</b><!-- comment --></p>'
+        + '<span style="display:none">hidden</span><span hidden>hidden</span>'
+        + '<span class="lt-line-clamp__ellipsis lt-line-clamp__ellipsis--dummy">... see more</span> tail</div>'
+    )
+
+    assert scraper.element_text(tree) == 'First line\nsecond line\ntail'
+
+
+def linkedin_page(path):
+    """Fixture page served by the stand-in server for a linkedin.com path"""
+    if path.startswith('/in/'):
+        return read_fixture('profile.html')
+    if path == '/company/acme-analytics/about/':
+        return read_fixture('company_about.html')
+    return None
+
+
+def profile_urls(n):
+    return ['https://www.linkedin.com/in/profile-' + str(i) + '/' for i in range(n)]
+
+
+def test_pool_scrapes_the_profiles_of_a_stand_in_server():
+    urls = profile_urls(6)
+    with StandInServer(linkedin_page) as server:
+        profiles_df = scraper.scrape_all_profiles_pool(lambda: HTTPDriver(server.url), urls, n_workers=3,
+                                                       log_in=False, from_source=True)
+
+    assert list(profiles_df['url']) == urls
+    assert (profiles_df['Name'] == 'Jane Tan').all()
+    assert (profiles_df['Job position'] == 'Data Scientist').all()
+    assert (profiles_df['Industry'] == 'Computer Software').all()
+
+
+def test_pool_replaces_a_dead_browser():
+    urls = profile_urls(6)
+    drivers = []
+    with StandInServer(linkedin_page) as server:
+        def make_driver():
+            drivers.append(DeadDriver() if len(drivers) == 0 else HTTPDriver(server.url))
+            return drivers[-1]
+
+        profiles_df = scraper.scrape_all_profiles_pool(make_driver, urls, n_workers=1, retries=1, restart_after=2,
+                                                       log_in=False, from_source=True)
+
+    # the dead browser only used up one attempt of the first two profiles
+    assert list(profiles_df['url']) == urls
+    assert len(drivers) == 2
+    assert drivers[0].quit_called
+
+
+def test_pool_retires_workers_whose_browsers_keep_dying():
+    drivers = []
+    def make_driver():
+        drivers.append(DeadDriver())
+        return drivers[-1]
+
+    profiles_df = scraper.scrape_all_profiles_pool(make_driver, profile_urls(20), n_workers=2, retries=5,
+                                                   restart_after=2, max_restarts=1, log_in=False, from_source=True)
+
+    assert profiles_df.empty
+    assert len(drivers) == 2 * 2
+
+
+def test_resumed_checkpoint_gives_the_same_frame_as_scraping_in_memory(tmp_path):
+    class CountingDriver(HTTPDriver):
+        def get(self, url):
+            self.urls.append(url)
+            super().get(url)
+
+    urls = profile_urls(4)
+    checkpoint_path = str(tmp_path / 'profiles.jsonl')
+    with StandInServer(linkedin_page) as server:
+        in_memory_df = scraper.scrape_all_profiles(HTTPDriver(server.url), urls, from_source=True)
+
+        # a crawl that stopped after the first two profiles
+        scraper.scrape_all_profiles(HTTPDriver(server.url), urls[:2], from_source=True, checkpoint_path=checkpoint_path)
+        driver = CountingDriver(server.url)
+        driver.urls = []
+        resumed_df = scraper.scrape_all_profiles(driver, urls, from_source=True, checkpoint_path=checkpoint_path,
+                                                 resume=True)
+
+    assert [url for url in driver.urls if '/in/' in url] == urls[2:]
+    pdt.assert_frame_equal(resumed_df, in_memory_df)
+
+
+def test_page_readiness_learns_the_timeout_of_a_signal():
+    readiness = scraper.PageReadiness(min_timeout=0.2, max_timeout=5)
+    driver = LxmlDriver(read_fixture('profile.html'), PROFILE_URL)
+
+    assert readiness.timeout('profile') == 5
+    assert readiness.wait(driver, 'profile', lambda driver: driver.find_elements_by_id('experience-section'))
+    # the signal showed up at once
+    assert readiness.timeout('profile') == 0.2
+
+
+def test_page_readiness_backs_off_a_signal_that_times_out():
+    readiness = scraper.PageReadiness(min_timeout=0.05, max_timeout=0.4, max_waits=3)
+    driver = LxmlDriver(read_fixture('profile.html'), PROFILE_URL)
+    missing = lambda driver: driver.find_elements_by_id('no-such-section')
+
+    start = time.perf_counter()
+    assert readiness.wait(driver, 'missing', missing) is False
+    assert time.perf_counter() - start >= 0.4
+    assert readiness.timeout('missing') == 0.2
+    readiness.wait(driver, 'missing', missing)
+    readiness.wait(driver, 'missing', missing)
+    readiness.wait(driver, 'missing', missing)
+    assert readiness.timeout('missing') == 0.05
+
+    # a success resets the timeout to the learned one
+    readiness.wait(driver, 'missing', lambda driver: True)
+    assert readiness.timeout('missing') == 0.05 and readiness.timeouts['missing'] == 0
+
+    # only the last max_waits waits are kept
+    summary = readiness.summary()
+    assert summary.loc['missing', 'Waits'] == 3
+    assert summary.loc['missing', 'Timeouts'] == 2
+
+
+def test_page_readiness_document_ready_waits_for_the_network_to_go_quiet():
+    class LoadingDriver(LxmlDriver):
+        """Page that loads a resource on each of its first 3 polls"""
+        polls = 0
+
+        def execute_script(self, script, *args):
+            if script == scraper.RESOURCE_COUNT_SCRIPT:
+                self.polls += 1
+                return ['complete', 1 if self.polls <= 3 else 0]
+            return super().execute_script(script, *args)
+
+    readiness = scraper.PageReadiness(max_timeout=5)
+    driver = LoadingDriver(read_fixture('profile.html'), PROFILE_URL)
+
+    assert readiness.document_ready(driver, quiet_time=0.3)
+    # quiet for quiet_time after the last resource, with polls every 0.1 s
+    assert driver.polls >= 3 + 3
+    assert readiness.summary().loc['document ready', 'Timeouts'] == 0
+
+
+def test_industry_cache_forgets_companies_without_industry_sooner(tmp_path):
+    cache = scraper.IndustryCache(str(tmp_path / 'industries.sqlite'), negative_ttl=0)
+    cache.set('https://www.linkedin.com/company/acme-analytics/about/', 'Computer Software')
+    cache.set('https://www.linkedin.com/company/globex/', np.nan)
+
+    assert cache.get('https://www.linkedin.com/company/acme-analytics/') == (True, 'Computer Software')
+    assert cache.get('https://www.linkedin.com/company/globex/') == (False, None)
+    cache.close()
+
+
+def test_industry_cache_expires_evicts_and_counts(tmp_path):
+    cache = scraper.IndustryCache(str(tmp_path / 'industries.sqlite'), max_size=2)
+    urls = ['https://www.linkedin.com/company/' + name + '/' for name in ['acme-analytics', 'globex', 'initech']]
+    for url in urls:
+        cache.set(url, 'Computer Software')
+
+    # the least recently used company only stays on disk
+    assert list(cache.memory) == urls[1:]
+    assert cache.get(urls[1]) == (True, 'Computer Software')
+    assert cache.get(urls[0]) == (True, 'Computer Software')
+    assert list(cache.memory) == [urls[1], urls[0]]
+    assert cache.get('https://www.linkedin.com/company/hooli/') == (False, None)
+    assert cache.stats() == {'memory hits': 1, 'disk hits': 1, 'misses': 1, 'hit rate': 2 / 3}
+    cache.close()
+
+    expired_cache = scraper.IndustryCache(str(tmp_path / 'industries.sqlite'), ttl=0)
+    assert expired_cache.get(urls[0]) == (False, None)
+    expired_cache.close()
+
+
+def test_scrape_industries_scrapes_each_company_once(tmp_path):
+    class CountingDriver(HTTPDriver):
+        def get(self, url):
+            self.urls.append(url)
+            super().get(url)
+
+    def company_page(path):
+        return read_fixture('company_about.html') if path.endswith('/about/') else None
+
+    company_urls = ['https://www.linkedin.com/company/acme-analytics/', 'https://www.linkedin.com/company/acme-analytics',
+                    'https://www.linkedin.com/company/Acme-Analytics/?trk=public_profile', np.nan,
+                    'https://www.linkedin.com/company/globex/about/']
+    cache = scraper.IndustryCache(str(tmp_path / 'industries.sqlite'))
+    with StandInServer(company_page) as server:
+        driver = CountingDriver(server.url)
+        driver.urls = []
+        industries_df = scraper.scrape_industries(driver, company_urls, cache=cache)
+        assert driver.urls == ['https://www.linkedin.com/company/acme-analytics/about/',
+                               'https://www.linkedin.com/company/globex/about/']
+
+        # the next batch comes from the cache
+        driver.urls = []
+        cached_df = scraper.scrape_industries(driver, company_urls, cache=cache)
+        assert driver.urls == []
+    cache.close()
+
+    assert industries_df['Industry'].tolist()[:3] == ['Computer Software'] * 3
+    assert np.isnan(industries_df.loc[3, 'Industry'])
+    assert industries_df.loc[4, 'Industry'] == 'Computer Software'
+    pdt.assert_frame_equal(cached_df, industries_df)
+
+
+def test_exp_frame_marks_ongoing_jobs():
+    records = [scraper.ExpRecord(np.nan, np.nan, np.nan, np.nan, dates, np.nan)
+               for dates in ['Jul 2018 – Present', '2015 – 2016', '', 'sometime']]
+
+    exp_df = scraper.exp_frame(records)
+
+    assert exp_df['Career ongoing'].tolist() == [True, False, pd.NA, pd.NA]
+    assert exp_df['Career end date'].isna().tolist() == [True, False, True, True]
+
+
+@pytest.mark.parametrize('date_str, degree, start, end, ongoing', [
+    # a degree given in years runs from Aug to Jun, a job from Jan to Jan
+    ('2014 – 2018', True, '2014-08-01', '2018-06-01', False),
+    ('2014 – 2018', False, '2014-01-01', '2018-01-01', False),
+    ('Jan 2015 – 2016', True, '2015-01-01', '2016-06-01', False),
+    ('Jul 2018 – Present', False, '2018-07-01', None, True),
+    ('Jul 2018 – present', True, '2018-07-01', None, True),
+    # a single month or year
+    ('Aug 2016', False, '2016-08-01', '2016-08-28', False),
+    ('2019', False, '2019-01-01', '2019-01-01', False),
+    ('Sept 2016 – Jan 2017', False, '2016-09-01', '2017-01-01', False),
+    ('2015 - 2016', False, '2015-01-01', '2016-01-01', False),
+    ('', False, None, None, False),
+    (np.nan, True, None, None, False),
+])
+def test_parse_date_ranges(date_str, degree, start, end, ongoing):
+    start_dates, end_dates, ongoing_mask = scraper.parse_date_ranges([date_str], degree=degree)
+
+    # None is NaT
+    np.testing.assert_array_equal(start_dates, np.array([start], dtype='datetime64[ns]'))
+    np.testing.assert_array_equal(end_dates, np.array([end], dtype='datetime64[ns]'))
+    assert ongoing_mask.tolist() == [ongoing]
+
+
+@pytest.mark.parametrize('date_str', ['sometime', 'Foo 2016 – 2017', '2016 – Bar 2017'])
+def test_parse_date_ranges_raises_on_strings_that_are_not_dates(date_str):
+    with pytest.raises(ValueError, match='not in LinkedIn format'):
+        scraper.parse_date_ranges(['2015 – 2016', date_str])
+
+    start_dates, end_dates, ongoing = scraper.parse_date_ranges(['2015 – 2016', date_str], errors='coerce')
+    assert not np.isnat(start_dates[0])
+    assert np.isnat(start_dates[1]) and np.isnat(end_dates[1]) and not ongoing[1]
+
+
+def test_traced_driver_records_element_calls():
+    driver = scraper.TracedDriver(LxmlDriver(read_fixture('profile.html'), PROFILE_URL))
+
+    scraper.tracer.reset()
+    scraper.tracer.enabled = True
+    try:
+        exp_df = scraper.scrape_exp_indiv(driver, PROFILE_URL, reload=False, industries=False)
+    finally:
+        scraper.tracer.enabled = False
+
+    summary = scraper.tracer.summary()
+    pdt.assert_frame_equal(exp_df, expected_exp_df())
+    assert summary.loc['driver.find_element_by_xpath', 'Calls'] > 0
+    # the company links of the entries that have one
+    assert summary.loc['element.get_attribute', 'Calls'] == 2
+    assert summary.loc['element.text', 'Calls'] > 0
+    assert 'scrape_exp_indiv' in summary.index
+
+
+def test_traced_driver_passes_the_wrapped_elements_to_the_browser():
+    class Browser(LxmlDriver):
+        def execute_script(self, script, *args):
+            self.script_args = args
+
+    browser = Browser(read_fixture('profile.html'), PROFILE_URL)
+    driver = scraper.TracedDriver(browser)
+    element = driver.find_element_by_xpath(scraper.PROFILE_PROBE_XPATHS["profile dp"])
+    driver.execute_script("arguments[0].click();", element)
+
+    assert isinstance(element, scraper.TracedElement)
+    assert browser.script_args == (element.wrapped,)
+
+
+def test_scrape_profile_gives_up_after_its_time_budget():
+    class BlankPageDriver(LxmlDriver):
+        def get(self, url):
+            self.load('<html><body></body></html>', url)
+
+    start = time.perf_counter()
+    profile_df = scraper.scrape_profile(BlankPageDriver(), PROFILE_URL, from_source=True, time_budget=0.2)
+
+    assert time.perf_counter() - start < scraper.PROFILE_TIME_BUDGET
+    assert profile_df['Name'].isna().all()
+
+
+def parse_fixture_profile():
+    return scraper.parse_profile_source(read_fixture('profile.html'), PROFILE_URL)